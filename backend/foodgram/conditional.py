@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+from .versions import get_versions, user_version_name
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def get_validators(names, timestamps=(), viewer=None):
+    versions = get_versions(*names)
+    stamps = [versions[name] for name in names]
+    stamps.extend(timestamps)
+    etag = hashlib.md5(
+        ":".join(map(str, [viewer, *stamps])).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return quote_etag(etag), max(stamps) // 1_000_000
+
+
+def conditional(get_view_versions, per_user=False):
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return view_method(self, request, *args, **kwargs)
+            versions = get_view_versions(self, request, *args, **kwargs)
+            if versions is None:
+                return view_method(self, request, *args, **kwargs)
+            names, timestamps = versions
+            viewer = None
+            if per_user and request.user.is_authenticated:
+                viewer = request.user.pk
+                names = [*names, user_version_name(viewer)]
+            etag, last_modified = get_validators(names, timestamps, viewer)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                return response
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            if per_user:
+                patch_cache_control(response, no_cache=True, private=True)
+                patch_vary_headers(response, ["Authorization"])
+            else:
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
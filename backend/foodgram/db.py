@@ -0,0 +1,85 @@
+from django.db import connection
+from django.utils import timezone
+
+
+def quote(name):
+    return connection.ops.quote_name(name)
+
+
+def placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def link_rows(model, owner_field, owner_id, target_field, target_ids,
+              exclude_owner=False):
+    if not target_ids:
+        return set()
+    owner = model._meta.get_field(owner_field)
+    target = model._meta.get_field(target_field)
+    target_meta = target.related_model._meta
+    columns = [owner.column, target.column]
+    values = ["%s", quote(target_meta.pk.column)]
+    params = [owner_id]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    for field in model._meta.concrete_fields:
+        if getattr(field, "auto_now_add", False):
+            columns.append(field.column)
+            values.append("%s")
+            params.append(now)
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)} "
+        f"({', '.join(quote(column) for column in columns)}) "
+        f"SELECT {', '.join(values)} FROM {quote(target_meta.db_table)} "
+        f"WHERE {quote(target_meta.pk.column)} "
+        f"IN ({placeholders(target_ids)})"
+    )
+    params.extend(target_ids)
+    if exclude_owner:
+        sql += f" AND {quote(target_meta.pk.column)} <> %s"
+        params.append(owner_id)
+    sql += (
+        f" ON CONFLICT ({quote(owner.column)}, {quote(target.column)}) "
+        f"DO NOTHING RETURNING {quote(target.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {row[0] for row in cursor.fetchall()}
+
+
+def unlink_rows(model, owner_field, owner_id, target_field,
+                target_ids=None):
+    owner = model._meta.get_field(owner_field)
+    target = model._meta.get_field(target_field)
+    sql = (
+        f"DELETE FROM {quote(model._meta.db_table)} "
+        f"WHERE {quote(owner.column)} = %s"
+    )
+    params = [owner_id]
+    if target_ids is not None:
+        if not target_ids:
+            return set()
+        sql += f" AND {quote(target.column)} IN ({placeholders(target_ids)})"
+        params.extend(target_ids)
+    sql += f" RETURNING {quote(target.column)}"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {row[0] for row in cursor.fetchall()}
+
+
+def increment_rows(model, unique_fields, field, rows):
+    if not rows:
+        return
+    table = quote(model._meta.db_table)
+    unique_columns = [
+        quote(model._meta.get_field(name).column) for name in unique_fields]
+    column = quote(model._meta.get_field(field).column)
+    row_sql = f"({placeholders([*unique_columns, column])})"
+    sql = (
+        f"INSERT INTO {table} ({', '.join([*unique_columns, column])}) "
+        f"VALUES {', '.join([row_sql] * len(rows))} "
+        f"ON CONFLICT ({', '.join(unique_columns)}) "
+        f"DO UPDATE SET {column} = {table}.{column} + EXCLUDED.{column}"
+    )
+    params = [value for row in sorted(rows) for value in row]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
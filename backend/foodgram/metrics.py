@@ -0,0 +1,59 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+REQUESTS = Counter(
+    "foodgram_requests_total",
+    "Handled requests.",
+    ["view", "method", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "foodgram_request_duration_seconds",
+    "Request handling time.",
+    ["view"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "foodgram_request_db_queries",
+    "Database queries per request.",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+CACHE_REQUESTS = Counter(
+    "foodgram_cache_requests_total",
+    "Application cache lookups.",
+    ["cache", "result"],
+)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def get_view_label(request):
+    match = request.resolver_match
+    if match is None:
+        return "unmatched"
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+    actions = getattr(match.func, "actions", None) or {}
+    method = request.method.lower()
+    return f"{view_class.__name__}.{actions.get(method, method)}"
+
+
+def render_metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,165 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+from .metrics import (
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUESTS,
+    get_view_label,
+)
+
+logger = logging.getLogger("foodgram.requests")
+
+current_stats = ContextVar("current_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self, detect_duplicates=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serialize_depth = 0
+        self.statements = Counter() if detect_duplicates else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            if self.statements is not None:
+                self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        if self.statements is None:
+            return []
+        return [
+            {"sql": sql, "count": count}
+            for sql, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+def timed_data(prop):
+    def data(serializer):
+        stats = current_stats.get()
+        if stats is None:
+            return prop.fget(serializer)
+        stats.serialize_depth += 1
+        started = time.perf_counter()
+        try:
+            return prop.fget(serializer)
+        finally:
+            stats.serialize_depth -= 1
+            if not stats.serialize_depth:
+                stats.serialize_time += time.perf_counter() - started
+
+    data.timed = True
+    return property(data)
+
+
+def install_serializer_timing():
+    for serializer_class in (serializers.Serializer,
+                             serializers.ListSerializer):
+        if not getattr(serializer_class.data.fget, "timed", False):
+            serializer_class.data = timed_data(serializer_class.data)
+
+
+install_serializer_timing()
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        self.duplicate_threshold = settings.REQUEST_TIMING_DUPLICATE_THRESHOLD
+
+    def __call__(self, request):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return self.get_response(request)
+        stats = RequestStats(detect_duplicates=self.duplicate_threshold > 0)
+        token = current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        total_time = time.perf_counter() - started
+        if self.shows_header(request):
+            response["Server-Timing"] = (
+                'db;dur={:.1f};desc="{} queries", serialize;dur={:.1f}, '
+                'total;dur={:.1f}'.format(
+                    stats.db_time * 1000,
+                    stats.queries,
+                    stats.serialize_time * 1000,
+                    total_time * 1000,
+                )
+            )
+        self.log(request, response, stats, total_time)
+        return response
+
+    def shows_header(self, request):
+        if settings.DEBUG or settings.REQUEST_TIMING_HEADER:
+            return True
+        user = getattr(request, "user", None)
+        return bool(user and user.is_staff)
+
+    def log(self, request, response, stats, total_time):
+        match = request.resolver_match
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 2),
+            "serialize_ms": round(stats.serialize_time * 1000, 2),
+            "total_ms": round(total_time * 1000, 2),
+        }
+        duplicates = stats.duplicates(self.duplicate_threshold)
+        if duplicates:
+            record["duplicates"] = duplicates
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        view = get_view_label(request)
+        REQUESTS.labels(
+            view=view, method=request.method, status=response.status_code
+        ).inc()
+        REQUEST_DURATION.labels(view=view).observe(duration)
+        REQUEST_QUERIES.labels(view=view).observe(counter.queries)
+        return response
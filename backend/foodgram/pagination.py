@@ -0,0 +1,63 @@
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+CURSOR_MODE = "cursor"
+
+
+def estimate_count(queryset):
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class KeysetPagination(CursorPagination):
+    ordering = "id"
+    page_size_query_param = "limit"
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, "get_ordering"):
+            return view.get_ordering()
+        return super().get_ordering(request, queryset, view)
+
+    def get_count(self):
+        mode = self.request.query_params.get(self.count_query_param)
+        if mode == "exact":
+            return self.queryset.count()
+        if mode == "estimate":
+            return estimate_count(self.queryset)
+        return None
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.get_count(),
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class KeysetPaginationMixin:
+    keyset_pagination_class = KeysetPagination
+    pagination_mode_query_param = "pagination"
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            mode = self.request.query_params.get(
+                self.pagination_mode_query_param)
+            if mode == CURSOR_MODE:
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -0,0 +1,30 @@
+from ipaddress import ip_address, ip_network
+
+from django.conf import settings
+from rest_framework import permissions
+
+
+def in_networks(address, networks):
+    try:
+        address = ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ip_network(network.strip(), strict=False)
+        for network in networks
+    )
+
+
+def get_client_ip(request):
+    address = request.META.get("REMOTE_ADDR", "")
+    if in_networks(address, settings.METRICS_TRUSTED_PROXIES):
+        return request.META.get("HTTP_X_REAL_IP", address)
+    return address
+
+
+class IsStaffOrMetricsIP(permissions.BasePermission):
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        return in_networks(
+            get_client_ip(request), settings.METRICS_ALLOWED_IPS)
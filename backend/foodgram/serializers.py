@@ -0,0 +1,33 @@
+from rest_framework import serializers
+
+MAX_BATCH_SIZE = 100
+
+
+class IdListSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_BATCH_SIZE,
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
+def get_batch_results(ids, changed, existing, changed_status,
+                      unchanged_status, rejected=None):
+    rejected = rejected or {}
+    return {
+        "results": [
+            {
+                "id": pk,
+                "status": (
+                    rejected[pk] if pk in rejected
+                    else changed_status if pk in changed
+                    else unchanged_status if pk in existing
+                    else "not_found"
+                ),
+            }
+            for pk in ids
+        ]
+    }
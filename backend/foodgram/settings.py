@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pathlib import Path
 import os
 
@@ -38,6 +39,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.MetricsMiddleware',
+    'foodgram.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,6 +87,24 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The file-based default lives on a volume shared by the backend and the
+# image worker so invalidations made by either process reach the other.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', BASE_DIR / 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 100000)),
+        },
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -124,6 +145,17 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploaded media is stored under the SHA-256 of its content, so identical
+# files share one blob and every URL is immutable.
+STORAGES = {
+    'default': {
+        'BACKEND': 'foodgram.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -152,6 +184,90 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ]
 }
+
+# Share of requests measured by RequestTimingMiddleware, from 0 to 1, and
+# the number of identical statements per request reported as duplicates
+# (0 turns duplicate detection off). The Server-Timing header is sent to
+# staff users, in DEBUG, or to everyone when REQUEST_TIMING_HEADER is set.
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_TIMING_SAMPLE_RATE', '1'))
+REQUEST_TIMING_DUPLICATE_THRESHOLD = int(
+    os.getenv('REQUEST_TIMING_DUPLICATE_THRESHOLD', '0'))
+REQUEST_TIMING_HEADER = os.getenv(
+    'REQUEST_TIMING_HEADER', 'false').lower() == 'true'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'foodgram.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+INGREDIENT_SEARCH_BACKEND = os.getenv('INGREDIENT_SEARCH_BACKEND', 'database')
+
+# /api/metrics is open to staff users and to clients in METRICS_ALLOWED_IPS.
+# Behind nginx REMOTE_ADDR is the proxy, so the client address is read from
+# the X-Real-IP header that infra/nginx.conf sets, but only when the request
+# comes from one of METRICS_TRUSTED_PROXIES. Both settings take comma
+# separated addresses or networks in CIDR notation.
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',')
+METRICS_TRUSTED_PROXIES = [
+    proxy for proxy in os.getenv('METRICS_TRUSTED_PROXIES', '').split(',')
+    if proxy
+]
+
+# Recipe image renditions are produced by `manage.py process_image_jobs`;
+# a job stuck in processing longer than the timeout (seconds) is retried.
+IMAGE_JOB_TIMEOUT = int(os.getenv('IMAGE_JOB_TIMEOUT', '300'))
+IMAGE_JOB_MAX_ATTEMPTS = int(os.getenv('IMAGE_JOB_MAX_ATTEMPTS', '3'))
+
+# Limits for uploaded recipe images: decoded size in bytes, the longest
+# side in pixels, and how much of a base64 payload is kept in memory
+# before it is spooled to a temporary file.
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_SIZE', str(10 * 1024 * 1024)))
+RECIPE_IMAGE_MAX_DIMENSION = int(
+    os.getenv('RECIPE_IMAGE_MAX_DIMENSION', '6000'))
+RECIPE_IMAGE_SPOOL_SIZE = int(
+    os.getenv('RECIPE_IMAGE_SPOOL_SIZE', str(1024 * 1024)))
+
+# Authenticated tokens are kept in a per-process LRU map for up to
+# AUTH_TOKEN_CACHE_TTL seconds, which bounds how long a token revoked in
+# another process keeps working. AUTH_TOKEN_CACHE_SHARED adds the default
+# cache as a second tier shared by all workers.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '10000'))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', '30'))
+AUTH_TOKEN_CACHE_SHARED = os.getenv(
+    'AUTH_TOKEN_CACHE_SHARED', 'false').lower() == 'true'
+
+# Opt-in stateless JWT mode served under /api/auth/jwt/ next to the djoser
+# token endpoints. Access tokens are checked without database reads; the
+# deny-list of revoked tokens is re-read every JWT_DENY_LIST_INTERVAL
+# seconds.
+JWT_AUTH_ENABLED = os.getenv('JWT_AUTH_ENABLED', 'false').lower() == 'true'
+JWT_DENY_LIST_INTERVAL = int(os.getenv('JWT_DENY_LIST_INTERVAL', '5'))
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(
+        minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', '5'))),
+    'REFRESH_TOKEN_LIFETIME': timedelta(
+        days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', '1'))),
+    'AUTH_HEADER_TYPES': ('Bearer',),
+}
+
+if JWT_AUTH_ENABLED:
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'].append(
+        'users.jwt.StatelessJWTAuthentication')
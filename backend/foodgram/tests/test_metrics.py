@@ -0,0 +1,25 @@
+from django.test import TestCase, override_settings
+
+
+@override_settings(
+    METRICS_ALLOWED_IPS=["203.0.113.7"],
+    METRICS_TRUSTED_PROXIES=["172.16.0.0/12"],
+)
+class MetricsAccessTest(TestCase):
+    def get_status(self, **meta):
+        return self.client.get("/api/metrics", **meta).status_code
+
+    def test_allows_forwarded_client_from_trusted_proxy(self):
+        self.assertEqual(self.get_status(
+            REMOTE_ADDR="172.18.0.5", HTTP_X_REAL_IP="203.0.113.7"), 200)
+
+    def test_rejects_other_client_behind_trusted_proxy(self):
+        self.assertEqual(self.get_status(
+            REMOTE_ADDR="172.18.0.5", HTTP_X_REAL_IP="198.51.100.1"), 401)
+
+    def test_ignores_forwarded_address_from_untrusted_client(self):
+        self.assertEqual(self.get_status(
+            REMOTE_ADDR="198.51.100.1", HTTP_X_REAL_IP="203.0.113.7"), 401)
+
+    def test_allows_direct_client(self):
+        self.assertEqual(self.get_status(REMOTE_ADDR="203.0.113.7"), 200)
@@ -0,0 +1,36 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import CustomUser
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE, REQUEST_TIMING_SAMPLE_RATE=1)
+class ServerTimingHeaderTest(TestCase):
+    def get_header(self, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        return client.get("/api/tags/").get("Server-Timing")
+
+    def create_user(self, **fields):
+        return CustomUser.objects.create_user(
+            email="user@example.com", username="user",
+            first_name="user", last_name="user", password="password",
+            **fields,
+        )
+
+    def test_hidden_from_regular_clients(self):
+        self.assertIsNone(self.get_header())
+        self.assertIsNone(self.get_header(self.create_user()))
+
+    def test_sent_to_staff(self):
+        self.assertIn("db;dur=", self.get_header(
+            self.create_user(is_staff=True)))
+
+    @override_settings(REQUEST_TIMING_HEADER=True)
+    def test_sent_to_everyone_when_enabled(self):
+        self.assertIn("db;dur=", self.get_header())
@@ -20,9 +20,11 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import MetricsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/metrics", MetricsView.as_view(), name="metrics"),
     path("api/", include("users.urls")),
     path("api/ingredients/", include("ingredients.urls")),
     path("api/recipes/", include("recipes.urls")),
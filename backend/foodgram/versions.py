@@ -0,0 +1,42 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSIONS_CACHE_VERSION = 1
+
+
+def version_key(name):
+    return f"version:{name}"
+
+
+def user_version_name(user_pk):
+    return f"user:{user_pk}"
+
+
+def get_timestamp():
+    return time.time_ns() // 1000
+
+
+def get_versions(*names):
+    keys = {version_key(name): name for name in names}
+    versions = cache.get_many(keys, version=VERSIONS_CACHE_VERSION)
+    missing = {key: get_timestamp() for key in keys if key not in versions}
+    for key, value in missing.items():
+        if not cache.add(key, value, timeout=None,
+                         version=VERSIONS_CACHE_VERSION):
+            value = cache.get(key, value, version=VERSIONS_CACHE_VERSION)
+        versions[key] = value
+    return {keys[key]: value for key, value in versions.items()}
+
+
+def set_version(name):
+    key = version_key(name)
+    current = cache.get(key, 0, version=VERSIONS_CACHE_VERSION)
+    cache.set(
+        key, max(get_timestamp(), current + 1),
+        timeout=None, version=VERSIONS_CACHE_VERSION)
+
+
+def bump_version(name):
+    transaction.on_commit(lambda: set_version(name))
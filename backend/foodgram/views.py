@@ -0,0 +1,13 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from .metrics import render_metrics
+from .permissions import IsStaffOrMetricsIP
+
+
+class MetricsView(APIView):
+    permission_classes = [IsStaffOrMetricsIP]
+
+    def get(self, request):
+        content, content_type = render_metrics()
+        return HttpResponse(content, content_type=content_type)
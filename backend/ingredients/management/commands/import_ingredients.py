@@ -1,25 +1,150 @@
+import csv
 import json
+import re
+import time
+from itertools import islice
+from pathlib import Path
+
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from foodgram.versions import bump_version
 from ingredients.models import Ingredient
 
+BATCH_SIZE = 1000
+READ_SIZE = 64 * 1024
+SEPARATORS = re.compile(r'[\s,]*')
+CSV_HEADER = ['name', 'measurement_unit']
+
+
+class Rollback(Exception):
+    pass
+
+
+def iter_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        chunk = file.read(READ_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            position = SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('JSON file must contain a list.')
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield item
+        if not chunk:
+            raise ValueError('Unexpected end of JSON file.')
+
+
+def iter_csv(file):
+    for row in csv.reader(file):
+        if len(row) < 2 or row[:2] == CSV_HEADER:
+            continue
+        yield {'name': row[0], 'measurement_unit': row[1]}
+
+
+READERS = {
+    'json': iter_json,
+    'csv': iter_csv,
+}
+
 
 class Command(BaseCommand):
-    help = 'Imports ingredients from a JSON file'
+    help = 'Imports ingredients from a JSON or CSV file'
 
     def add_arguments(self, parser):
-        parser.add_argument('json_file',
+        parser.add_argument('path',
                             type=str,
-                            help='The path to the JSON file.')
+                            help='The path to the JSON or CSV file.')
+        parser.add_argument('--format',
+                            choices=READERS,
+                            help='File format, detected from the extension '
+                                 'by default.')
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=BATCH_SIZE,
+                            help='Number of rows written per query.')
+        parser.add_argument('--dry-run',
+                            action='store_true',
+                            help='Report new ingredients without saving '
+                                 'them.')
 
     def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Unsupported file format: {file_format}')
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be positive.')
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        self.processed = self.created = 0
+        self.started = time.monotonic()
         try:
-            with open(options['json_file'], 'r', encoding='utf-8') as jsonfile:
-                data = json.load(jsonfile)
-                for item in data:
-                    Ingredient.objects.create(
-                        name=item['name'],
-                        measurement_unit=item['measurement_unit'])
-                self.stdout.write(
-                    self.style.SUCCESS('Successfully imported ingredients'))
+            with open(path, 'r', encoding='utf-8', newline='') as file:
+                rows = READERS[file_format](file)
+                with transaction.atomic():
+                    while True:
+                        batch = list(islice(rows, options['batch_size']))
+                        if not batch:
+                            break
+                        self.import_batch(batch)
+                    if self.dry_run:
+                        raise Rollback
+                    if self.created:
+                        bump_version('ingredients')
+        except Rollback:
+            pass
         except Exception as e:
             raise CommandError(f'Error importing ingredients: {e}')
+        elapsed = time.monotonic() - self.started
+        action = 'Would import' if self.dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {self.created} new ingredients, '
+            f'{self.processed - self.created} already present '
+            f'({self.processed} rows in {elapsed:.1f}s, '
+            f'{self.processed / max(elapsed, 1e-6):.0f} rows/s)'))
+
+    def import_batch(self, batch):
+        rows = {
+            (item['name'].strip(), item['measurement_unit'].strip()): None
+            for item in batch
+        }
+        existing = set(
+            Ingredient.objects.filter(
+                name__in={name for name, _ in rows}
+            ).values_list('name', 'measurement_unit')
+        )
+        new_rows = [row for row in rows if row not in existing]
+        self.processed += len(batch)
+        self.created += len(new_rows)
+        if self.verbosity >= 2:
+            for name, measurement_unit in new_rows:
+                self.stdout.write(f'+ {name}, {measurement_unit}')
+        if not self.dry_run:
+            Ingredient.objects.bulk_create(
+                [
+                    Ingredient(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in new_rows
+                ],
+                ignore_conflicts=True,
+            )
+        if self.verbosity >= 1:
+            elapsed = time.monotonic() - self.started
+            self.stdout.write(
+                f'Processed {self.processed} rows '
+                f'({self.processed / max(elapsed, 1e-6):.0f} rows/s)')
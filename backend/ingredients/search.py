@@ -0,0 +1,81 @@
+from bisect import bisect_left
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.functions import Upper
+
+from .models import Ingredient
+from foodgram.metrics import record_cache
+from foodgram.versions import get_versions
+
+FIELDS = ("id", "name", "measurement_unit")
+
+
+class IngredientIndex:
+    def __init__(self, ingredients):
+        self.items = sorted(
+            ingredients, key=lambda item: (item["name"].lower(), item["id"])
+        )
+        self.keys = [item["name"].lower() for item in self.items]
+
+    def search(self, query, limit=None):
+        query = query.lower()
+        start = bisect_left(self.keys, query)
+        end = bisect_left(self.keys, query + "\uffff", lo=start)
+        prefix_matches = self.items[start:end]
+        substring_matches = (
+            item
+            for index, (key, item) in enumerate(zip(self.keys, self.items))
+            if (index < start or index >= end) and query in key
+        )
+        return list(islice(chain(prefix_matches, substring_matches), limit))
+
+
+_index = None
+_index_version = None
+
+
+def get_index_version():
+    return get_versions("ingredients")["ingredients"]
+
+
+def get_index():
+    global _index, _index_version
+    version = get_index_version()
+    if version != _index_version:
+        invalidate_index()
+    record_cache("ingredients", _index is not None)
+    if _index is None:
+        _index_version = version
+        _index = IngredientIndex(Ingredient.objects.values(*FIELDS))
+    return _index
+
+
+def invalidate_index():
+    global _index
+    _index = None
+
+
+def search_in_database(query, limit=None):
+    ingredients = Ingredient.objects.order_by(Upper("name"), "id").values(
+        *FIELDS)
+    results = list(ingredients.filter(name__istartswith=query)[:limit])
+    if limit is not None and len(results) >= limit:
+        return results
+    remaining = None if limit is None else limit - len(results)
+    # Prefix matches above use ingredient_name_prefix_idx. Substring
+    # matches cannot: the trigram index serves queries of three or more
+    # characters, shorter ones scan the table.
+    results.extend(
+        ingredients.filter(name__icontains=query)
+        .exclude(name__istartswith=query)[:remaining]
+    )
+    return results
+
+
+def search_ingredients(query, limit=None):
+    if (settings.INGREDIENT_SEARCH_BACKEND == "memory"
+            or connection.vendor != "postgresql"):
+        return get_index().search(query, limit)
+    return search_in_database(query, limit)
@@ -0,0 +1,34 @@
+from django.test import TestCase, override_settings
+
+from foodgram.versions import set_version
+from ingredients.models import Ingredient
+from ingredients.search import get_index, invalidate_index
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class IngredientIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredient = Ingredient.objects.create(
+            name="salt", measurement_unit="g")
+
+    def setUp(self):
+        invalidate_index()
+
+    def search_names(self, query):
+        return [item["name"] for item in get_index().search(query)]
+
+    def test_reuses_index_while_version_is_unchanged(self):
+        index = get_index()
+        self.assertIs(get_index(), index)
+
+    def test_rebuilds_when_shared_version_changes(self):
+        self.assertEqual(self.search_names("sa"), ["salt"])
+        Ingredient.objects.filter(pk=self.ingredient.pk).update(
+            name="sea salt")
+        set_version("ingredients")
+        self.assertEqual(self.search_names("sa"), ["sea salt"])
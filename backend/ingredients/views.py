@@ -1,9 +1,12 @@
 from rest_framework import viewsets, permissions
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
+from foodgram.conditional import conditional
 from .models import Ingredient
 from .serializers import IngredientSerializer
 from .filters import IngredientFilter
+from .search import search_ingredients
 
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
@@ -12,5 +15,25 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend]
     pagination_class = None
-    search_fields = ["^name"]
     filterset_class = IngredientFilter
+
+    def get_versions(self, request, *args, **kwargs):
+        return ["ingredients"], []
+
+    @conditional(get_versions)
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get("name")
+        if not name:
+            return super().list(request, *args, **kwargs)
+        return Response(search_ingredients(name, self.get_limit()))
+
+    @conditional(get_versions)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get("limit", ""))
+        except ValueError:
+            return None
+        return limit if limit > 0 else None
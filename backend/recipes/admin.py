@@ -1,7 +1,12 @@
 from django.contrib import admin
-from django.db.models import Count
 
-from .models import Recipe, RecipeIngredient, ShoppingList, Favorite
+from .models import (
+    Favorite,
+    ImageJob,
+    Recipe,
+    RecipeIngredient,
+    ShoppingList,
+)
 
 
 class RecipeIngredientInline(admin.TabularInline):
@@ -17,16 +22,6 @@ class RecipeAdmin(admin.ModelAdmin):
     inlines = [RecipeIngredientInline]
     autocomplete_fields = ["tags", "author"]
 
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        queryset = queryset.annotate(_favorites_count=Count("in_favorites"))
-        return queryset
-
-    def favorites_count(self, obj):
-        return obj._favorites_count
-
-    favorites_count.admin_order_field = "_favorites_count"
-
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
@@ -47,3 +42,10 @@ class FavoriteAdmin(admin.ModelAdmin):
     list_display = ("user", "recipe", "added_at")
     list_filter = ("user",)
     search_fields = ("user__username", "recipe__name")
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ("image", "recipe", "status", "attempts", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("image", "recipe__name")
@@ -0,0 +1,356 @@
+import base64
+import io
+import math
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from .cart_totals import rebuild_cart_totals
+from .models import Favorite, Recipe, RecipeIngredient, ShoppingList
+from .tag_masks import rebuild_tag_masks
+from ingredients.models import Ingredient
+from ingredients.search import invalidate_index
+from tags.cache import invalidate_tags
+from tags.models import Tag
+from users.models import CustomUser, UserFollow
+
+PASSWORDS = ('Benchmark-password-1', 'Benchmark-password-2')
+INGREDIENTS_FILE = settings.BASE_DIR.parent / 'data' / 'ingredients.json'
+INGREDIENTS_PER_RECIPE = 5
+TAGS_PER_RECIPE = 2
+TAGS = 8
+FAVORITES = 50
+CART = 20
+FOLLOWS = 30
+BATCH_SIZE = 5000
+WARM_UP_PATHS = ('/api/tags/', '/api/ingredients/?name=a', '/api/recipes/')
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (1, 1)).save(buffer, 'PNG')
+    return ('data:image/png;base64,'
+            + base64.b64encode(buffer.getvalue()).decode())
+
+
+@contextmanager
+def benchmark_environment():
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmark',
+        }},
+        MEDIA_ROOT=media_root,
+    ):
+        try:
+            with transaction.atomic():
+                yield
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            invalidate_tags()
+            invalidate_index()
+
+
+class Dataset:
+    def __init__(self, recipes, repeat, ingredients_file=INGREDIENTS_FILE,
+                 seed=0):
+        self.random = random.Random(seed)
+        self.runs = repeat + 1
+        self.reserved = 4 * self.runs
+        if recipes < self.reserved + FAVORITES + CART:
+            raise ValueError(
+                f'At least {self.reserved + FAVORITES + CART} recipes are '
+                f'needed for {repeat} repeats.')
+        self.recipes_total = recipes
+        self.users_total = max(FOLLOWS + 2 * self.runs + 2, recipes // 10)
+        self.ingredients_file = ingredients_file
+
+    def seed(self):
+        call_command('import_ingredients', str(self.ingredients_file),
+                     verbosity=0, stdout=StringIO())
+        self.ingredient_ids = list(
+            Ingredient.objects.values_list('id', flat=True))
+        self.tags = Tag.objects.bulk_create(
+            Tag(name=f'benchmark {index}', color=f'#0000{index:02x}',
+                slug=f'benchmark-{index}')
+            for index in range(TAGS)
+        )
+        password = make_password(PASSWORDS[0])
+        self.users = CustomUser.objects.bulk_create(
+            (
+                CustomUser(
+                    email=f'benchmark{index}@foodgram.local',
+                    username=f'benchmark{index}',
+                    first_name='Bench',
+                    last_name=str(index),
+                    password=password,
+                )
+                for index in range(self.users_total)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        self.viewer, self.login_user = self.users[:2]
+        self.authors = self.users[2:]
+        self.token = Token.objects.create(user=self.viewer).key
+        self.seed_recipes()
+        self.seed_relations()
+
+    def seed_recipes(self):
+        recipes = Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author=(self.viewer if index < 2 * self.runs
+                            else self.random.choice(self.authors)),
+                    name=f'Benchmark recipe {index}',
+                    image='recipes/benchmark.png',
+                    text='Benchmark recipe text. ' * 20,
+                    cooking_time=self.random.randint(1, 120),
+                )
+                for index in range(self.recipes_total)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        self.recipe_ids = [recipe.id for recipe in recipes]
+        RecipeIngredient.objects.bulk_create(
+            (
+                RecipeIngredient(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=self.random.randint(1, 500),
+                )
+                for recipe_id in self.recipe_ids
+                for ingredient_id in self.random.sample(
+                    self.ingredient_ids, INGREDIENTS_PER_RECIPE)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        Recipe.tags.through.objects.bulk_create(
+            (
+                Recipe.tags.through(recipe_id=recipe_id, tag_id=tag.id)
+                for recipe_id in self.recipe_ids
+                for tag in self.random.sample(self.tags, TAGS_PER_RECIPE)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        rebuild_tag_masks()
+
+    def seed_relations(self):
+        own = 2 * self.runs
+        self.own_recipe_ids = self.recipe_ids[:own]
+        self.toggle_recipe_ids = self.recipe_ids[own:own + 2 * self.runs]
+        others = self.recipe_ids[own + 2 * self.runs:]
+        Favorite.objects.bulk_create(
+            Favorite(user=self.viewer, recipe_id=recipe_id)
+            for recipe_id in others[:FAVORITES]
+        )
+        ShoppingList.objects.bulk_create(
+            ShoppingList(user=self.viewer, recipe_id=recipe_id)
+            for recipe_id in others[FAVORITES:FAVORITES + CART]
+        )
+        UserFollow.objects.bulk_create(
+            UserFollow(user_from=self.viewer, user_to=author)
+            for author in self.authors[:FOLLOWS]
+        )
+        self.unfollowed_ids = [
+            author.id
+            for author in self.authors[FOLLOWS:FOLLOWS + self.runs]
+        ]
+        rebuild_cart_totals()
+
+    def recipe_data(self, index, ingredients=INGREDIENTS_PER_RECIPE):
+        return {
+            'ingredients': [
+                {'id': ingredient_id, 'amount': index + 1}
+                for ingredient_id in self.random.sample(
+                    self.ingredient_ids, ingredients)
+            ],
+            'tags': [tag.id for tag in self.random.sample(self.tags, 2)],
+            'image': make_image(),
+            'name': f'Benchmark {index}',
+            'text': 'Benchmark',
+            'cooking_time': 10,
+        }
+
+    def login_token(self):
+        return Token.objects.get_or_create(user=self.login_user)[0].key
+
+    def scenarios(self):
+        recipe = self.recipe_ids[-1]
+        author = self.authors[0].id
+        slugs = [tag.slug for tag in self.tags[:2]]
+        toggle = self.toggle_recipe_ids
+        return [
+            ('recipes.list (anonymous)', lambda i: {
+                'path': f'/api/recipes/?page={i + 1}', 'auth': False}),
+            ('recipes.list', lambda i: {
+                'path': f'/api/recipes/?page={i + 1}'}),
+            ('recipes.list ?tags', lambda i: {
+                'path': '/api/recipes/',
+                'data': {'tags': slugs, 'page': i + 1}}),
+            ('recipes.list ?is_favorited', lambda i: {
+                'path': '/api/recipes/?is_favorited=1'}),
+            ('recipes.list ?is_in_shopping_cart', lambda i: {
+                'path': '/api/recipes/?is_in_shopping_cart=1'}),
+            ('recipes.list ?author', lambda i: {
+                'path': f'/api/recipes/?author={author}'}),
+            ('recipes.list ?pagination=cursor', lambda i: {
+                'path': '/api/recipes/?pagination=cursor'}),
+            ('recipes.retrieve', lambda i: {
+                'path': f'/api/recipes/{self.recipe_ids[-1 - i]}/'}),
+            ('recipes.retrieve (repeated)', lambda i: {
+                'path': f'/api/recipes/{recipe}/'}),
+            ('recipes.create', lambda i: {
+                'method': 'post', 'path': '/api/recipes/',
+                'data': self.recipe_data(i)}),
+            ('recipes.partial_update', lambda i: {
+                'method': 'patch',
+                'path': f'/api/recipes/{self.own_recipe_ids[i]}/',
+                'data': self.recipe_data(i)}),
+            ('recipes.destroy', lambda i: {
+                'method': 'delete',
+                'path': f'/api/recipes/{self.own_recipe_ids[-1 - i]}/'}),
+            ('recipes.favorite add', lambda i: {
+                'method': 'post',
+                'path': f'/api/recipes/{toggle[i]}/favorite/'}),
+            ('recipes.favorite remove', lambda i: {
+                'method': 'delete',
+                'path': f'/api/recipes/{toggle[i]}/favorite/'}),
+            ('recipes.shopping_cart add', lambda i: {
+                'method': 'post',
+                'path': f'/api/recipes/{toggle[-1 - i]}/shopping_cart/'}),
+            ('recipes.shopping_cart remove', lambda i: {
+                'method': 'delete',
+                'path': f'/api/recipes/{toggle[-1 - i]}/shopping_cart/'}),
+            ('recipes.download_shopping_cart', lambda i: {
+                'path': '/api/recipes/download_shopping_cart/'}),
+            ('users.list', lambda i: {
+                'path': f'/api/users/?page={i + 1}'}),
+            ('users.create', lambda i: {
+                'method': 'post', 'path': '/api/users/', 'auth': False,
+                'data': {
+                    'email': f'benchmark-new{i}@foodgram.local',
+                    'username': f'benchmark-new{i}',
+                    'first_name': 'Bench',
+                    'last_name': 'Mark',
+                    'password': PASSWORDS[0],
+                }}),
+            ('users.retrieve', lambda i: {
+                'path': f'/api/users/{self.authors[i].id}/'}),
+            ('users.me', lambda i: {'path': '/api/users/me/'}),
+            ('users.subscriptions', lambda i: {
+                'path': '/api/users/subscriptions/?recipes_limit=3'}),
+            ('users.subscribe add', lambda i: {
+                'method': 'post',
+                'path': f'/api/users/{self.unfollowed_ids[i]}/subscribe/'}),
+            ('users.subscribe remove', lambda i: {
+                'method': 'delete',
+                'path': f'/api/users/{self.unfollowed_ids[i]}/subscribe/'}),
+            ('users.set_password', lambda i: {
+                'method': 'post', 'path': '/api/users/set_password/',
+                'token': self.login_token(),
+                'data': {
+                    'current_password': PASSWORDS[i % 2],
+                    'new_password': PASSWORDS[(i + 1) % 2],
+                }}),
+            ('auth.token_login', lambda i: {
+                'method': 'post', 'path': '/api/auth/token/login/',
+                'auth': False,
+                'data': {
+                    'email': self.login_user.email,
+                    'password': PASSWORDS[self.runs % 2],
+                }}),
+            ('auth.token_logout', lambda i: {
+                'method': 'post', 'path': '/api/auth/token/logout/',
+                'token': self.login_token()}),
+            ('ingredients.list', lambda i: {
+                'path': '/api/ingredients/', 'auth': False}),
+            ('ingredients.search', lambda i: {
+                'path': '/api/ingredients/', 'auth': False,
+                'data': {'name': 'мол'[:i % 3 + 1]}}),
+            ('ingredients.retrieve', lambda i: {
+                'path': f'/api/ingredients/{self.ingredient_ids[i]}/',
+                'auth': False}),
+            ('tags.list', lambda i: {'path': '/api/tags/', 'auth': False}),
+            ('tags.retrieve', lambda i: {
+                'path': f'/api/tags/{self.tags[i % TAGS].id}/',
+                'auth': False}),
+        ]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def send_request(client, token, method='get', path='', data=None, auth=True):
+    headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if auth else {}
+    if method == 'get':
+        response = client.get(path, data, **headers)
+    else:
+        response = getattr(client, method)(
+            path, data, content_type='application/json', **headers)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(client, token, prepare, repeat):
+    timings, queries = [], []
+    for index in range(repeat + 1):
+        kwargs = prepare(index)
+        kwargs['token'] = kwargs.get('token', token)
+        memory = index == repeat
+        if memory:
+            tracemalloc.start()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = send_request(client, **kwargs)
+            elapsed = time.perf_counter() - started
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            timings.append(elapsed * 1000)
+            queries.append(len(context))
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'{kwargs["path"]} returned {response.status_code}: '
+                f'{response.content[:200]!r}')
+    return {
+        'queries': max(queries),
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(dataset, repeat, only=None):
+    client = Client()
+    for path in WARM_UP_PATHS:
+        client.get(path)
+    results = {}
+    for name, prepare in dataset.scenarios():
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = measure(client, dataset.token, prepare, repeat)
+    return results
@@ -0,0 +1,109 @@
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MediaBlob, Recipe
+from foodgram.storage import TEMP_PREFIX
+
+MEDIA_DIRECTORIES = ("recipes",)
+
+
+def retain_files(names):
+    if not names:
+        return
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(name=name) for name in names], ignore_conflicts=True)
+    MediaBlob.objects.filter(name__in=names).update(
+        refcount=F("refcount") + 1, updated_at=timezone.now())
+
+
+def release_files(names):
+    if names:
+        MediaBlob.objects.filter(name__in=names).update(
+            refcount=F("refcount") - 1, updated_at=timezone.now())
+
+
+def get_referenced_files():
+    references = Counter()
+    for recipe in Recipe.objects.only("image", "image_renditions").iterator(
+        chunk_size=2000
+    ):
+        references.update(recipe.get_media_files())
+    return references
+
+
+@transaction.atomic
+def rebuild_blobs():
+    references = get_referenced_files()
+    blobs = {blob.name: blob for blob in MediaBlob.objects.all()}
+    to_create, to_update = [], []
+    for name in references.keys() | blobs.keys():
+        refcount = references.get(name, 0)
+        blob = blobs.get(name)
+        if blob is None:
+            to_create.append(MediaBlob(name=name, refcount=refcount))
+        elif blob.refcount != refcount:
+            blob.refcount = refcount
+            to_update.append(blob)
+    MediaBlob.objects.bulk_create(to_create)
+    MediaBlob.objects.bulk_update(to_update, ["refcount"], batch_size=1000)
+    return len(to_create) + len(to_update)
+
+
+def is_expired(name, cutoff):
+    try:
+        return default_storage.get_modified_time(name) < cutoff
+    except FileNotFoundError:
+        return True
+
+
+def collect_garbage(grace, dry_run=False):
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    candidates = list(
+        MediaBlob.objects.filter(refcount__lte=0, updated_at__lt=cutoff)
+        .values_list("name", flat=True)
+    )
+    if not candidates:
+        return []
+    references = get_referenced_files()
+    garbage = [
+        name for name in candidates
+        if name not in references and is_expired(name, cutoff)
+    ]
+    if dry_run:
+        return garbage
+    for name in garbage:
+        with transaction.atomic():
+            deleted, _ = MediaBlob.objects.filter(
+                name=name, refcount__lte=0).delete()
+            if deleted:
+                default_storage.delete(name)
+    return garbage
+
+
+def walk_storage(directory):
+    directories, files = default_storage.listdir(directory)
+    for name in files:
+        yield f"{directory}/{name}"
+    for name in directories:
+        yield from walk_storage(f"{directory}/{name}")
+
+
+def find_orphans(grace):
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    known = set(MediaBlob.objects.values_list("name", flat=True))
+    references = get_referenced_files()
+    for directory in MEDIA_DIRECTORIES:
+        if not default_storage.exists(directory):
+            continue
+        for name in walk_storage(directory):
+            if name in known or name in references:
+                continue
+            if (os.path.basename(name).startswith(TEMP_PREFIX)
+                    or is_expired(name, cutoff)):
+                yield name
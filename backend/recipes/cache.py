@@ -0,0 +1,116 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+
+from .models import Favorite, Recipe, RecipeIngredient, ShoppingList
+from foodgram.metrics import record_cache
+from foodgram.versions import bump_version, get_versions
+from users.models import UserFollow
+
+RECIPE_CACHE_VERSION = 1
+RECIPE_CACHE_TIMEOUT = 60 * 60
+GENERATION_NAME = "recipes"
+
+
+def get_generation():
+    return get_versions(GENERATION_NAME)[GENERATION_NAME]
+
+
+def bump_generation():
+    bump_version(GENERATION_NAME)
+
+
+def recipe_cache_key(recipe_id, generation=None):
+    if generation is None:
+        generation = get_generation()
+    return f"recipe:{generation}:{recipe_id}"
+
+
+def delete_recipes(recipe_ids):
+    generation = get_generation()
+    cache.delete_many(
+        [recipe_cache_key(recipe_id, generation) for recipe_id in recipe_ids]
+    )
+
+
+def invalidate_recipes(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    transaction.on_commit(lambda: delete_recipes(recipe_ids))
+
+
+def load_recipe_data(recipe_id):
+    from .serializers import RecipeReadSerializer
+
+    recipe = (
+        Recipe.objects.select_related("author")
+        .prefetch_related(
+            Prefetch(
+                "recipe_ingredients",
+                queryset=RecipeIngredient.objects.select_related(
+                    "ingredient"),
+            ),
+            "tags",
+        )
+        .filter(pk=recipe_id)
+        .first()
+    )
+    if recipe is None:
+        return None
+    recipe.is_favorited = False
+    recipe.is_in_shopping_cart = False
+    return RecipeReadSerializer(
+        recipe, context={"subscribed_ids": set()}).data
+
+
+def get_shared_recipe_data(recipe_id):
+    key = recipe_cache_key(recipe_id)
+    data = cache.get(key, version=RECIPE_CACHE_VERSION)
+    record_cache("recipes", data is not None)
+    if data is None:
+        data = load_recipe_data(recipe_id)
+        if data is not None:
+            cache.set(
+                key, data,
+                timeout=RECIPE_CACHE_TIMEOUT, version=RECIPE_CACHE_VERSION)
+    return data
+
+
+def get_viewer_flags(recipe_id, user):
+    if not user.is_authenticated:
+        return {
+            "is_favorited": False,
+            "is_in_shopping_cart": False,
+            "is_subscribed": False,
+        }
+    return Recipe.objects.filter(pk=recipe_id).values(
+        is_favorited=Exists(
+            Favorite.objects.filter(user=user, recipe=OuterRef("pk"))),
+        is_in_shopping_cart=Exists(
+            ShoppingList.objects.filter(user=user, recipe=OuterRef("pk"))),
+        is_subscribed=Exists(
+            UserFollow.objects.filter(
+                user_from=user, user_to=OuterRef("author_id"))),
+    ).first()
+
+
+def get_recipe_data(recipe_id, request):
+    data = get_shared_recipe_data(recipe_id)
+    if data is None:
+        return None
+    flags = get_viewer_flags(recipe_id, request.user)
+    if flags is None:
+        return None
+    data = dict(data)
+    if data["image"]:
+        data["image"] = request.build_absolute_uri(data["image"])
+    data["images"] = {
+        size_name: {
+            extension: request.build_absolute_uri(url)
+            for extension, url in formats.items()
+        }
+        for size_name, formats in data["images"].items()
+    }
+    data["author"] = dict(data["author"], is_subscribed=flags["is_subscribed"])
+    data["is_favorited"] = flags["is_favorited"]
+    data["is_in_shopping_cart"] = flags["is_in_shopping_cart"]
+    return data
@@ -0,0 +1,130 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+
+from .models import RecipeIngredient, ShoppingCartTotal, ShoppingList
+from foodgram.db import increment_rows
+
+
+def get_recipe_amounts(recipe):
+    return get_recipes_amounts([recipe])
+
+
+def get_recipes_amounts(recipes):
+    amounts = Counter()
+    for ingredient_id, amount in RecipeIngredient.objects.filter(
+        recipe__in=recipes
+    ).values_list("ingredient_id", "amount"):
+        amounts[ingredient_id] += amount
+    return amounts
+
+
+def get_cart_user_ids(recipe):
+    return list(
+        ShoppingList.objects.filter(recipe=recipe).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+def get_live_totals(user_ids=None):
+    items = ShoppingList.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    return {
+        (item["user_id"], item["ingredient_id"]): item["amount"]
+        for item in items.values(
+            "user_id",
+            ingredient_id=F("recipe__recipe_ingredients__ingredient_id"),
+        )
+        .filter(ingredient_id__isnull=False)
+        .annotate(amount=Sum("recipe__recipe_ingredients__amount"))
+    }
+
+
+@transaction.atomic
+def update_cart_totals(user_ids, deltas):
+    added = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta > 0
+    }
+    removed = {
+        ingredient_id: -delta
+        for ingredient_id, delta in deltas.items() if delta < 0
+    }
+    if not user_ids:
+        return
+    increment_rows(
+        ShoppingCartTotal, ("user", "ingredient"), "amount",
+        [
+            (user_id, ingredient_id, amount)
+            for user_id in user_ids
+            for ingredient_id, amount in added.items()
+        ],
+    )
+    if removed:
+        totals = ShoppingCartTotal.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=removed)
+        totals.update(amount=Case(
+            *(
+                When(
+                    ingredient_id=ingredient_id,
+                    amount__gt=amount,
+                    then=F("amount") - amount,
+                )
+                for ingredient_id, amount in removed.items()
+            ),
+            default=Value(0),
+        ))
+        totals.filter(amount=0).delete()
+
+
+def add_recipe_to_totals(user, recipe):
+    add_recipes_to_totals(user, [recipe])
+
+
+def remove_recipe_from_totals(user, recipe):
+    remove_recipes_from_totals(user, [recipe])
+
+
+def add_recipes_to_totals(user, recipes):
+    update_cart_totals([user.id], get_recipes_amounts(recipes))
+
+
+def remove_recipes_from_totals(user, recipes):
+    amounts = get_recipes_amounts(recipes)
+    update_cart_totals([user.id], {
+        ingredient_id: -amount for ingredient_id, amount in amounts.items()
+    })
+
+
+def clear_totals(user):
+    ShoppingCartTotal.objects.filter(user=user).delete()
+
+
+def apply_recipe_changes(recipe, old_amounts, new_amounts):
+    deltas = Counter(new_amounts)
+    deltas.subtract(old_amounts)
+    update_cart_totals(get_cart_user_ids(recipe), deltas)
+
+
+@transaction.atomic
+def rebuild_cart_totals(user_ids=None):
+    totals = ShoppingCartTotal.objects.all()
+    if user_ids is not None:
+        totals = totals.filter(user_id__in=user_ids)
+    totals.delete()
+    ShoppingCartTotal.objects.bulk_create(
+        ShoppingCartTotal(
+            user_id=user_id, ingredient_id=ingredient_id, amount=amount
+        )
+        for (user_id, ingredient_id), amount
+        in get_live_totals(user_ids).items()
+    )
+
+
+def rebuild_totals_on_commit(user_ids):
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: rebuild_cart_totals(user_ids))
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Favorite, Recipe, ShoppingList
+
+COUNTER_FIELDS = {
+    Favorite: "favorites_count",
+    ShoppingList: "in_carts_count",
+}
+
+
+def get_live_counter(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(recipe=OuterRef("pk"))
+            .order_by()
+            .values("recipe")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def get_drifted_recipes():
+    live = {
+        f"live_{field}": get_live_counter(model)
+        for model, field in COUNTER_FIELDS.items()
+    }
+    drift = Q()
+    for field in COUNTER_FIELDS.values():
+        drift |= ~Q(**{field: F(f"live_{field}")})
+    return Recipe.objects.alias(**live).filter(drift)
+
+
+@transaction.atomic
+def reconcile_counters():
+    return get_drifted_recipes().select_for_update().update(
+        **{
+            field: get_live_counter(model)
+            for model, field in COUNTER_FIELDS.items()
+        }
+    )
@@ -0,0 +1,89 @@
+import csv
+import json
+
+from django.db.models import F
+
+from .models import ShoppingCartTotal
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class ShoppingListWriter:
+    content_type = "text/plain"
+    extension = "txt"
+
+    def header(self):
+        return ""
+
+    def row(self, item, index):
+        return "{} - {} {}\n".format(
+            item["name"], item["total_amount"], item["measurement_unit"]
+        )
+
+    def footer(self):
+        return ""
+
+    def write(self, items):
+        yield self.header()
+        for index, item in enumerate(items):
+            yield self.row(item, index)
+        yield self.footer()
+
+
+class CSVShoppingListWriter(ShoppingListWriter):
+    content_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def header(self):
+        return self.writer.writerow(["name", "amount", "measurement_unit"])
+
+    def row(self, item, index):
+        return self.writer.writerow(
+            [item["name"], item["total_amount"], item["measurement_unit"]]
+        )
+
+
+class JSONShoppingListWriter(ShoppingListWriter):
+    content_type = "application/json"
+    extension = "json"
+
+    def header(self):
+        return "["
+
+    def row(self, item, index):
+        separator = "," if index else ""
+        return separator + json.dumps(item, ensure_ascii=False)
+
+    def footer(self):
+        return "]"
+
+
+WRITERS = {
+    writer.extension: writer
+    for writer in (
+        ShoppingListWriter,
+        CSVShoppingListWriter,
+        JSONShoppingListWriter,
+    )
+}
+
+
+def get_shopping_list_items(user):
+    return (
+        ShoppingCartTotal.objects.filter(user=user)
+        .values(
+            name=F("ingredient__name"),
+            measurement_unit=F("ingredient__measurement_unit"),
+            total_amount=F("amount"),
+        )
+        .order_by("name", "measurement_unit")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
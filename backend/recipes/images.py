@@ -0,0 +1,130 @@
+import posixpath
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ImageJob, Recipe
+
+RENDITION_SIZES = {
+    "thumb": (160, 160),
+    "card": (480, 480),
+    "full": (1280, 1280),
+}
+RENDITION_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+RENDITIONS_DIR = "recipes/renditions"
+
+
+def get_media_url(path, request=None):
+    url = default_storage.url(path)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def enqueue_renditions(recipe):
+    if recipe.image:
+        ImageJob.objects.create(recipe=recipe, image=recipe.image.name)
+
+
+def enqueue_missing_renditions():
+    recipes = Recipe.objects.filter(image_renditions={}).exclude(
+        image="").exclude(
+        image_jobs__status__in=[ImageJob.PENDING, ImageJob.PROCESSING])
+    return len(ImageJob.objects.bulk_create(
+        ImageJob(recipe_id=recipe_id, image=image)
+        for recipe_id, image in recipes.values_list("id", "image")
+    ))
+
+
+def get_rendition_path(image_name, size_name, extension):
+    stem = posixpath.splitext(posixpath.basename(image_name))[0]
+    return f"{RENDITIONS_DIR}/{stem}-{size_name}.{extension}"
+
+
+def render_image(image, size, image_format, options):
+    rendition = image.copy()
+    rendition.thumbnail(size, Image.LANCZOS)
+    buffer = BytesIO()
+    rendition.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def make_renditions(image_name):
+    with default_storage.open(image_name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image = image.convert("RGB")
+    renditions = {}
+    for size_name, size in RENDITION_SIZES.items():
+        renditions[size_name] = {}
+        for extension, (image_format, options) in RENDITION_FORMATS.items():
+            path = get_rendition_path(image_name, size_name, extension)
+            renditions[size_name][extension] = default_storage.save(
+                path, render_image(image, size, image_format, options))
+    return renditions
+
+
+@transaction.atomic
+def claim_jobs(limit):
+    stale = timezone.now() - timedelta(
+        seconds=settings.IMAGE_JOB_TIMEOUT)
+    ImageJob.objects.filter(
+        status=ImageJob.PROCESSING,
+        updated_at__lt=stale,
+        attempts__gte=settings.IMAGE_JOB_MAX_ATTEMPTS,
+    ).update(
+        status=ImageJob.FAILED,
+        error="Timed out while processing",
+        updated_at=timezone.now(),
+    )
+    jobs = list(
+        ImageJob.objects.select_for_update(skip_locked=True)
+        .filter(
+            Q(status=ImageJob.PENDING)
+            | Q(status=ImageJob.PROCESSING, updated_at__lt=stale),
+            attempts__lt=settings.IMAGE_JOB_MAX_ATTEMPTS,
+        )
+        .order_by("id")[:limit]
+    )
+    ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+        status=ImageJob.PROCESSING,
+        attempts=F("attempts") + 1,
+        updated_at=timezone.now(),
+    )
+    return jobs
+
+
+def process_job(job):
+    try:
+        renditions = make_renditions(job.image)
+    except Exception as error:
+        failed = job.attempts + 1 >= settings.IMAGE_JOB_MAX_ATTEMPTS
+        ImageJob.objects.filter(pk=job.pk).update(
+            status=ImageJob.FAILED if failed else ImageJob.PENDING,
+            error=repr(error),
+            updated_at=timezone.now(),
+        )
+        return False
+    with transaction.atomic():
+        recipe = Recipe.objects.select_for_update().filter(
+            pk=job.recipe_id, image=job.image).first()
+        if recipe is not None:
+            recipe.image_renditions = renditions
+            recipe.save(update_fields=["image_renditions", "updated_at"])
+        ImageJob.objects.filter(pk=job.pk).update(
+            status=ImageJob.DONE, error="", updated_at=timezone.now())
+    return True
+
+
+def process_jobs(limit):
+    jobs = claim_jobs(limit)
+    return [process_job(job) for job in jobs]
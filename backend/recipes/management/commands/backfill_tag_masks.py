@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import Recipe
+from recipes.tag_masks import get_live_tag_masks, rebuild_tag_masks
+
+
+class Command(BaseCommand):
+    help = 'Fills the tag bitmask of every recipe from its tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=1000,
+                            help='Number of recipes updated per query.')
+        parser.add_argument('--check',
+                            action='store_true',
+                            help='Only verify masks, do not update them.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if not options['check']:
+            updated = rebuild_tag_masks(options['batch_size'])
+            self.stdout.write(f'Updated tag masks of {updated} recipes')
+        live = get_live_tag_masks()
+        mismatches = [
+            (recipe_id, tag_mask)
+            for recipe_id, tag_mask in Recipe.objects.values_list(
+                'id', 'tag_mask').iterator(chunk_size=2000)
+            if live.get(recipe_id, 0) != tag_mask
+        ]
+        for recipe_id, tag_mask in mismatches:
+            self.stderr.write(
+                f'recipe {recipe_id}: stored {tag_mask}, '
+                f'expected {live.get(recipe_id, 0)}')
+        if mismatches:
+            raise CommandError(
+                f'{len(mismatches)} recipe tag masks are out of sync')
+        self.stdout.write(
+            self.style.SUCCESS('Recipe tag masks are consistent'))
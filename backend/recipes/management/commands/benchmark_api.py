@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.benchmarks import (
+    INGREDIENTS_FILE,
+    Dataset,
+    benchmark_environment,
+    run_benchmarks,
+)
+
+COLUMNS = ('queries', 'p50_ms', 'p95_ms', 'memory_kb')
+
+
+class Command(BaseCommand):
+    help = ('Seeds a synthetic dataset and measures queries, latency and '
+            'memory of every API endpoint')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes',
+                            type=int,
+                            default=1000,
+                            help='Number of recipes to seed.')
+        parser.add_argument('--repeat',
+                            type=int,
+                            default=20,
+                            help='Timed requests per endpoint.')
+        parser.add_argument('--only',
+                            nargs='+',
+                            help='Run only endpoints whose name contains '
+                                 'one of these strings.')
+        parser.add_argument('--ingredients-file',
+                            default=INGREDIENTS_FILE,
+                            help='Ingredients catalog to seed from.')
+        parser.add_argument('--baseline',
+                            help='JSON file with results to compare with.')
+        parser.add_argument('--save-baseline',
+                            help='Write the results to this JSON file.')
+        parser.add_argument('--tolerance',
+                            type=float,
+                            default=0.5,
+                            help='Allowed relative p95 latency growth over '
+                                 'the baseline.')
+        parser.add_argument('--min-delta-ms',
+                            type=float,
+                            default=5,
+                            help='Ignore p95 latency growth below this '
+                                 'many milliseconds.')
+
+    def handle(self, *args, **options):
+        try:
+            dataset = Dataset(options['recipes'], options['repeat'],
+                              options['ingredients_file'])
+        except ValueError as e:
+            raise CommandError(e)
+        with benchmark_environment():
+            dataset.seed()
+            self.stdout.write(
+                f'Seeded {dataset.recipes_total} recipes, '
+                f'{dataset.users_total} users, '
+                f'{len(dataset.ingredient_ids)} ingredients')
+            results = run_benchmarks(
+                dataset, options['repeat'], options['only'])
+        baseline = {}
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+        self.report(results, baseline)
+        if options['save_baseline']:
+            Path(options['save_baseline']).write_text(
+                json.dumps(results, indent=2, ensure_ascii=False) + '\n')
+        regressions = self.find_regressions(
+            results, baseline, options['tolerance'], options['min_delta_ms'])
+        if regressions:
+            raise CommandError(
+                'Regressions against the baseline:\n'
+                + '\n'.join(regressions))
+
+    def report(self, results, baseline):
+        width = max(len(name) for name in results)
+        self.stdout.write(
+            f'{"endpoint":<{width}}  '
+            + '  '.join(f'{column:>10}' for column in COLUMNS))
+        for name, result in results.items():
+            previous = baseline.get(name, {})
+            cells = []
+            for column in COLUMNS:
+                cell = f'{result[column]:g}'
+                if column in previous and previous[column] != result[column]:
+                    cell += f' ({previous[column]:g})'
+                cells.append(f'{cell:>10}')
+            self.stdout.write(f'{name:<{width}}  ' + '  '.join(cells))
+
+    def find_regressions(self, results, baseline, tolerance, min_delta_ms):
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            if result['queries'] > previous['queries']:
+                regressions.append(
+                    f'{name}: {result["queries"]} queries, '
+                    f'baseline {previous["queries"]}')
+            allowed = max(previous['p95_ms'] * (1 + tolerance),
+                          previous['p95_ms'] + min_delta_ms)
+            if result['p95_ms'] > allowed:
+                regressions.append(
+                    f'{name}: p95 {result["p95_ms"]} ms, '
+                    f'baseline {previous["p95_ms"]} ms')
+        return regressions
@@ -0,0 +1,68 @@
+from django.db import connection
+from django.core.management.base import BaseCommand
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+from recipes.benchmarks import benchmark_environment, make_image
+from recipes.models import Recipe
+from tags.models import Tag
+from users.models import CustomUser
+
+SIZES = (1, 10, 100)
+
+
+class Command(BaseCommand):
+    help = 'Counts queries of recipe create and update requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes',
+                            type=int,
+                            nargs='+',
+                            default=SIZES,
+                            help='Numbers of ingredients per recipe.')
+
+    def handle(self, *args, **options):
+        with benchmark_environment():
+            self.run(options['sizes'])
+
+    def run(self, sizes):
+        user = CustomUser.objects.create_user(
+            email='benchmark@foodgram.local', username='benchmark',
+            password='benchmark', first_name='Bench', last_name='Mark')
+        tag = Tag.objects.create(
+            name='benchmark', color='#abcdef', slug='benchmark')
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'benchmark {index}', measurement_unit='g')
+            for index in range(max(sizes) + 1)
+        )
+        ingredient_ids = [ingredient.id for ingredient in ingredients]
+        client = APIClient()
+        client.force_authenticate(user)
+        image = make_image()
+        self.stdout.write('ingredients  create  update')
+        for size in sizes:
+            data = {
+                'ingredients': [
+                    {'id': ingredient_id, 'amount': 1}
+                    for ingredient_id in ingredient_ids[:size]
+                ],
+                'tags': [tag.id],
+                'image': image,
+                'name': 'Benchmark',
+                'text': 'Benchmark',
+                'cooking_time': 1,
+            }
+            with CaptureQueriesContext(connection) as create_queries:
+                response = client.post('/api/recipes/', data, format='json')
+            recipe = Recipe.objects.get(pk=response.data['id'])
+            data['ingredients'] = [
+                {'id': ingredient_id, 'amount': 2}
+                for ingredient_id in ingredient_ids[1:size + 1]
+            ]
+            with CaptureQueriesContext(connection) as update_queries:
+                client.patch(
+                    f'/api/recipes/{recipe.id}/', data, format='json')
+            self.stdout.write(
+                f'{size:>11}  {len(create_queries):>6}  '
+                f'{len(update_queries):>6}')
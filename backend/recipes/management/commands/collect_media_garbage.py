@@ -0,0 +1,40 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from recipes.blobs import collect_garbage, find_orphans, rebuild_blobs
+
+
+class Command(BaseCommand):
+    help = 'Deletes recipe media files that are no longer referenced'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace',
+                            type=int,
+                            default=24 * 60 * 60,
+                            help='Seconds an unreferenced file is kept.')
+        parser.add_argument('--rebuild',
+                            action='store_true',
+                            help='Recount references before collecting.')
+        parser.add_argument('--orphans',
+                            action='store_true',
+                            help='Also delete files unknown to the database.')
+        parser.add_argument('--dry-run',
+                            action='store_true',
+                            help='Only list the files that would be deleted.')
+
+    def handle(self, *args, **options):
+        if options['rebuild'] and not options['dry_run']:
+            fixed = rebuild_blobs()
+            self.stdout.write(f'Fixed reference counts of {fixed} files')
+        garbage = collect_garbage(options['grace'], options['dry_run'])
+        if options['orphans']:
+            orphans = list(find_orphans(options['grace']))
+            if not options['dry_run']:
+                for name in orphans:
+                    default_storage.delete(name)
+            garbage += orphans
+        for name in garbage:
+            self.stdout.write(name)
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(
+            self.style.SUCCESS(f'{action} {len(garbage)} files'))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.images import enqueue_missing_renditions, process_jobs
+
+
+class Command(BaseCommand):
+    help = 'Generates resized renditions of uploaded recipe images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=10,
+                            help='Number of jobs claimed at once.')
+        parser.add_argument('--poll-interval',
+                            type=float,
+                            default=2.0,
+                            help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--enqueue-missing',
+                            action='store_true',
+                            help='Queue recipes that have no renditions yet.')
+        parser.add_argument('--once',
+                            action='store_true',
+                            help='Process the queued jobs and exit.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['enqueue_missing']:
+            queued = enqueue_missing_renditions()
+            self.stdout.write(f'Queued {queued} images')
+        while True:
+            results = process_jobs(options['batch_size'])
+            if results:
+                self.stdout.write(
+                    f'Processed {results.count(True)} images, '
+                    f'{results.count(False)} failed')
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['poll_interval'])
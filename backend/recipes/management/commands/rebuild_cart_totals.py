@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.cart_totals import get_live_totals, rebuild_cart_totals
+from recipes.models import ShoppingCartTotal
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds shopping cart totals and verifies them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check',
+                            action='store_true',
+                            help='Only verify totals, do not rebuild them.')
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rebuild_cart_totals()
+            self.stdout.write('Shopping cart totals rebuilt')
+        live = get_live_totals()
+        stored = {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount
+            in ShoppingCartTotal.objects.values_list(
+                'user_id', 'ingredient_id', 'amount')
+        }
+        mismatches = [
+            key for key in live.keys() | stored.keys()
+            if live.get(key) != stored.get(key)
+        ]
+        for user_id, ingredient_id in mismatches:
+            self.stderr.write(
+                f'user {user_id}, ingredient {ingredient_id}: '
+                f'stored {stored.get((user_id, ingredient_id))}, '
+                f'expected {live.get((user_id, ingredient_id))}')
+        if mismatches:
+            raise CommandError(
+                f'{len(mismatches)} shopping cart totals are out of sync')
+        self.stdout.write(
+            self.style.SUCCESS('Shopping cart totals are consistent'))
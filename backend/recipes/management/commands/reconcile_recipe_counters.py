@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.counters import (
+    COUNTER_FIELDS,
+    get_drifted_recipes,
+    get_live_counter,
+    reconcile_counters,
+)
+
+
+class Command(BaseCommand):
+    help = 'Fixes drifted favorite and shopping cart counters of recipes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check',
+                            action='store_true',
+                            help='Only report drift, do not fix it.')
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            fixed = reconcile_counters()
+            self.stdout.write(f'Fixed counters of {fixed} recipes')
+            return
+        fields = list(COUNTER_FIELDS.values())
+        drifted = get_drifted_recipes().annotate(
+            **{
+                f'live_{field}': get_live_counter(model)
+                for model, field in COUNTER_FIELDS.items()
+            }
+        ).values('id', *fields, *(f'live_{field}' for field in fields))
+        for recipe in drifted:
+            self.stderr.write(
+                f'recipe {recipe["id"]}: ' + ', '.join(
+                    f'{field} stored {recipe[field]}, '
+                    f'expected {recipe[f"live_{field}"]}'
+                    for field in fields
+                ))
+        if drifted:
+            raise CommandError(
+                f'{len(drifted)} recipes have out of sync counters')
+        self.stdout.write(
+            self.style.SUCCESS('Recipe counters are consistent'))
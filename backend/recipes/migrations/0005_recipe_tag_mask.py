@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+def fill_tag_masks(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    masks = {}
+    for recipe_id, tag_id in Recipe.tags.through.objects.values_list(
+            'recipe_id', 'tag_id'):
+        if 1 <= tag_id <= 63:
+            masks[recipe_id] = masks.get(recipe_id, 0) | 1 << (tag_id - 1)
+    recipes = [
+        Recipe(id=recipe_id, tag_mask=tag_mask)
+        for recipe_id, tag_mask in masks.items()
+    ]
+    Recipe.objects.bulk_update(recipes, ['tag_mask'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_tags_tag_recipe_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='tag_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_tag_masks, migrations.RunPython.noop),
+    ]
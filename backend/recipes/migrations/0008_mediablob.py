@@ -0,0 +1,54 @@
+# Generated by Django 4.2.11 on 2026-10-18 03:57
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    MediaBlob = apps.get_model('recipes', 'MediaBlob')
+    references = Counter()
+    for image, renditions in Recipe.objects.values_list(
+            'image', 'image_renditions'):
+        if image:
+            references[image] += 1
+        for formats in (renditions or {}).values():
+            references.update(formats.values())
+    MediaBlob.objects.bulk_create(
+        [
+            MediaBlob(name=name, refcount=refcount)
+            for name, refcount in references.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_imagejob_recipe_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(
+                        fields=['refcount', 'updated_at'],
+                        name='recipes_mediablob_gc_idx',
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
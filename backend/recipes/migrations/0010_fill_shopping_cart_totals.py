@@ -0,0 +1,41 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:20
+
+from django.db import migrations
+from django.db.models import F, Sum
+
+
+def fill_cart_totals(apps, schema_editor):
+    ShoppingList = apps.get_model('recipes', 'ShoppingList')
+    ShoppingCartTotal = apps.get_model('recipes', 'ShoppingCartTotal')
+    totals = (
+        ShoppingList.objects.values(
+            'user_id',
+            ingredient_id=F('recipe__recipe_ingredients__ingredient_id'),
+        )
+        .filter(ingredient_id__isnull=False)
+        .annotate(amount=Sum('recipe__recipe_ingredients__amount'))
+        .order_by()
+    )
+    ShoppingCartTotal.objects.all().delete()
+    ShoppingCartTotal.objects.bulk_create(
+        [
+            ShoppingCartTotal(
+                user_id=total['user_id'],
+                ingredient_id=total['ingredient_id'],
+                amount=total['amount'],
+            )
+            for total in totals.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_cart_totals, migrations.RunPython.noop),
+    ]
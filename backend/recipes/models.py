@@ -41,10 +41,40 @@ class Recipe(models.Model):
         related_name="recipes"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    tag_mask = models.BigIntegerField(default=0, editable=False)
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    in_carts_count = models.PositiveIntegerField(default=0, editable=False)
+    image_renditions = models.JSONField(default=dict, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-favorites_count", "-id"],
+                name="recipes_recipe_popular_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {"image", "image_renditions"} & instance.get_deferred_fields():
+            instance._stored_media = None
+        else:
+            instance._stored_media = instance.get_media_files()
+        return instance
+
+    def get_media_files(self):
+        image = self.__dict__.get("image")
+        image = getattr(image, "name", image)
+        files = {image} if image else set()
+        for formats in (self.__dict__.get("image_renditions") or {}).values():
+            files.update(formats.values())
+        return files
+
 
 class ShoppingList(models.Model):
     user = models.ForeignKey(
@@ -86,3 +116,75 @@ class Favorite(models.Model):
 
     def __str__(self):
         return f"{self.user} добавил {self.recipe} в избранное"
+
+
+class ShoppingCartTotal(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="shopping_cart_totals"
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name="shopping_cart_totals"
+    )
+    amount = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("user", "ingredient")
+
+    def __str__(self):
+        return f"{self.user}: {self.ingredient} - {self.amount}"
+
+
+class ImageJob(models.Model):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    recipe = models.ForeignKey(
+        "Recipe",
+        on_delete=models.CASCADE,
+        related_name="image_jobs"
+    )
+    image = models.CharField(max_length=MAX_LENGTH)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "id"], name="recipes_imagejob_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.image} ({self.status})"
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["refcount", "updated_at"],
+                name="recipes_mediablob_gc_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
@@ -0,0 +1,22 @@
+import json
+
+from django.utils.datastructures import MultiValueDict
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+JSON_PART = "data"
+
+
+class MultiPartJSONParser(MultiPartParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        result = super().parse(stream, media_type, parser_context)
+        if JSON_PART not in result.data:
+            return result
+        try:
+            data = json.loads(result.data[JSON_PART])
+        except ValueError as error:
+            raise ParseError(f"Multipart JSON parse error - {error}")
+        if not isinstance(data, dict):
+            raise ParseError("Multipart JSON part must be an object.")
+        data.update(result.files.dict())
+        return DataAndFiles(data, MultiValueDict())
@@ -1,10 +1,9 @@
-import base64
-
 from django.db import transaction
-from django.core.files.base import ContentFile
+from django.db.models import Prefetch, prefetch_related_objects
 
 from rest_framework import serializers
 
+from .cart_totals import apply_recipe_changes
 from .models import (
     Favorite,
     Ingredient,
@@ -13,8 +12,11 @@ from .models import (
     ShoppingList,
     Tag,
 )
+from .images import enqueue_renditions, get_media_url
+from .tag_masks import get_tag_mask
+from .uploads import check_image_limits, decode_data_uri
 from users.serializers import CustomUserSerializer
-from tags.serializers import TagSerializer
+from tags.cache import get_cached_tags
 
 
 MAX_AMOUNT = 1000
@@ -23,12 +25,24 @@ MAX_AMOUNT = 1000
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith("data:image"):
-            format, imgstr = data.split(";base64,")
-            ext = format.split("/")[-1]
-            data = ContentFile(base64.b64decode(imgstr), name="temp." + ext)
+            data = decode_data_uri(data)
+        if hasattr(data, "size") and hasattr(data, "seek"):
+            check_image_limits(data)
         return super().to_internal_value(data)
 
 
+class ImageRenditionsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        request = self.context.get("request")
+        return {
+            size_name: {
+                extension: get_media_url(path, request)
+                for extension, path in formats.items()
+            }
+            for size_name, formats in value.items()
+        }
+
+
 class RecipeIngredientReadSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source="ingredient.id", read_only=True)
     name = serializers.CharField(source="ingredient.name", read_only=True)
@@ -52,13 +66,14 @@ class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
 
 class RecipeReadSerializer(serializers.ModelSerializer):
     image = Base64ImageField(max_length=None, use_url=True)
-    tags = TagSerializer(many=True)
+    tags = serializers.SerializerMethodField()
     ingredients = RecipeIngredientReadSerializer(
         many=True, read_only=True, source="recipe_ingredients"
     )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     author = CustomUserSerializer(read_only=True)
+    images = ImageRenditionsField(source="image_renditions")
 
     class Meta:
 
@@ -67,6 +82,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "image",
+            "images",
             "text",
             "tags",
             "ingredients",
@@ -76,7 +92,15 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
         ]
 
+    def get_tags(self, obj):
+        tags = self.context.get("tags")
+        if tags is None:
+            tags = self.context["tags"] = get_cached_tags()
+        return [dict(tags[tag.id]) for tag in obj.tags.all()]
+
     def get_is_favorited(self, obj):
+        if hasattr(obj, "is_favorited"):
+            return obj.is_favorited
         user = self.context["request"].user
         if user.is_authenticated:
             is_favorited = Favorite.objects.filter(
@@ -85,6 +109,8 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         return False
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, "is_in_shopping_cart"):
+            return obj.is_in_shopping_cart
         user = self.context["request"].user
         if user.is_authenticated:
             is_in_shopping_cart = ShoppingList.objects.filter(
@@ -136,11 +162,12 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         if len(ingredient_ids) != len(set(ingredient_ids)):
             raise serializers.ValidationError(
                 "Ингредиенты не могут повторяться.")
+        existing_ingredients = Ingredient.objects.in_bulk(ingredient_ids)
         validated_ingredients = []
         for ingredient_data in value:
             ingredient_id = ingredient_data["id"]
             amount = ingredient_data["amount"]
-            if not Ingredient.objects.filter(id=ingredient_id).exists():
+            if ingredient_id not in existing_ingredients:
                 raise serializers.ValidationError(
                     f"Ингредиент с ID {ingredient_id} не существует."
                 )
@@ -176,44 +203,96 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         ingredients_data = validated_data.pop("recipe_ingredients")
         tags_data = validated_data.pop("tags")
-        recipe = Recipe.objects.create(**validated_data)
+        recipe = Recipe.objects.create(
+            tag_mask=get_tag_mask(tag.id for tag in tags_data),
+            **validated_data
+        )
         recipe.tags.set(tags_data)
-        for ingredient_data in ingredients_data:
-            ingredient = Ingredient.objects.get(id=ingredient_data["id"])
-            amount = ingredient_data["amount"]
-            RecipeIngredient.objects.create(
-                recipe=recipe, ingredient=ingredient, amount=amount
+        enqueue_renditions(recipe)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient_data["id"],
+                amount=ingredient_data["amount"],
             )
+            for ingredient_data in ingredients_data
+        )
         return recipe
 
     @transaction.atomic
     def update(self, instance, validated_data):
-        instance.tags.clear()
-        RecipeIngredient.objects.filter(recipe=instance).delete()
         ingredients_data = validated_data.pop("recipe_ingredients", [])
         tags_data = validated_data.pop("tags", [])
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        if "image" in validated_data:
+            instance.image_renditions = {}
+        instance.tag_mask = get_tag_mask(tag.id for tag in tags_data)
         instance.save()
         instance.tags.set(tags_data)
-        for ingredient_data in ingredients_data:
-            ingredient = Ingredient.objects.get(id=ingredient_data["id"])
-            amount = ingredient_data["amount"]
-            RecipeIngredient.objects.create(
-                recipe=instance, ingredient=ingredient, amount=amount
-            )
+        if "image" in validated_data:
+            enqueue_renditions(instance)
+        self.update_ingredients(instance, ingredients_data)
         return instance
 
+    def update_ingredients(self, instance, ingredients_data):
+        existing = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in instance.recipe_ingredients.all()
+        }
+        old_amounts = {
+            ingredient_id: recipe_ingredient.amount
+            for ingredient_id, recipe_ingredient in existing.items()
+        }
+        new_amounts = {
+            ingredient_data["id"]: ingredient_data["amount"]
+            for ingredient_data in ingredients_data
+        }
+        to_create, to_update = [], []
+        for ingredient_id, amount in new_amounts.items():
+            recipe_ingredient = existing.get(ingredient_id)
+            if recipe_ingredient is None:
+                to_create.append(RecipeIngredient(
+                    recipe=instance, ingredient_id=ingredient_id, amount=amount
+                ))
+            elif recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                to_update.append(recipe_ingredient)
+        to_delete = [
+            recipe_ingredient.pk
+            for ingredient_id, recipe_ingredient in existing.items()
+            if ingredient_id not in new_amounts
+        ]
+        if to_delete:
+            RecipeIngredient.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ["amount"])
+        if to_create:
+            RecipeIngredient.objects.bulk_create(to_create)
+        apply_recipe_changes(instance, old_amounts, new_amounts)
+
     def to_representation(self, instance):
         request = self.context.get("request")
+        prefetched = getattr(instance, "_prefetched_objects_cache", {})
+        if "recipe_ingredients" not in prefetched:
+            prefetch_related_objects(
+                [instance],
+                Prefetch(
+                    "recipe_ingredients",
+                    queryset=RecipeIngredient.objects.select_related(
+                        "ingredient"),
+                ),
+            )
         return RecipeReadSerializer(instance, context={"request": request}
                                     ).data
 
 
 class SimpleRecipeSerializer(serializers.ModelSerializer):
+    images = ImageRenditionsField(source="image_renditions")
+
     class Meta:
         model = Recipe
-        fields = ["id", "name", "image", "cooking_time"]
+        fields = ["id", "name", "image", "images", "cooking_time"]
 
 
 class ShoppingListSerializer(serializers.ModelSerializer):
@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from .blobs import release_files, retain_files
+from .cart_totals import get_cart_user_ids, rebuild_totals_on_commit
+from .cache import bump_generation, invalidate_recipes
+from .models import Favorite, Recipe, RecipeIngredient, ShoppingList
+from .tag_masks import add_tags_to_mask, get_tag_mask, remove_tags_from_mask
+from foodgram.versions import bump_version, user_version_name
+from ingredients.models import Ingredient
+from tags.models import Tag
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def reset_recipe_cache(sender, instance, **kwargs):
+    invalidate_recipes([instance.pk])
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_media_references(sender, instance, **kwargs):
+    stored = getattr(instance, "_stored_media", set())
+    if stored is None:
+        return
+    current = instance.get_media_files()
+    retain_files(current - stored)
+    release_files(stored - current)
+    instance._stored_media = current
+
+
+@receiver(post_delete, sender=Recipe)
+def release_recipe_media(sender, instance, **kwargs):
+    stored = getattr(instance, "_stored_media", None)
+    release_files(instance.get_media_files() if stored is None else stored)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def reset_recipe_ingredient_cache(sender, instance, **kwargs):
+    invalidate_recipes([instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def reset_recipe_tags_cache(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_recipes([instance.pk])
+        return
+    bump_version("tags")
+    if pk_set:
+        invalidate_recipes(pk_set)
+    else:
+        bump_generation()
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def update_recipe_tag_masks(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not reverse:
+        recipes = Recipe.objects.filter(pk=instance.pk)
+        mask = get_tag_mask(pk_set or ())
+        if action == "post_add" and instance.tag_mask & mask != mask:
+            add_tags_to_mask(recipes, pk_set)
+            instance.tag_mask |= mask
+        elif action == "post_remove" and instance.tag_mask & mask:
+            remove_tags_from_mask(recipes, pk_set)
+            instance.tag_mask &= ~mask
+        elif action == "post_clear" and instance.tag_mask:
+            recipes.update(tag_mask=0)
+            instance.tag_mask = 0
+    elif action in ("post_add", "post_remove"):
+        recipes = Recipe.objects.filter(pk__in=pk_set)
+        if action == "post_add":
+            add_tags_to_mask(recipes, [instance.pk])
+        else:
+            remove_tags_from_mask(recipes, [instance.pk])
+    elif action == "post_clear":
+        remove_tags_from_mask(Recipe.objects.all(), [instance.pk])
+
+
+@receiver(post_delete, sender=Tag)
+def remove_deleted_tag_from_masks(sender, instance, **kwargs):
+    remove_tags_from_mask(Recipe.objects.all(), [instance.pk])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def reset_all_recipes_cache(sender, **kwargs):
+    bump_generation()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reset_author_recipes_cache(sender, instance, created, update_fields,
+                               **kwargs):
+    if created or (update_fields and set(update_fields) == {"last_login"}):
+        return
+    bump_version("users")
+    invalidate_recipes(
+        instance.recipes.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def bump_user_recipes_version(sender, instance, **kwargs):
+    bump_version(user_version_name(instance.user_id))
+
+
+def get_origin_model(origin):
+    return getattr(origin, "model", type(origin))
+
+
+@receiver(pre_delete, sender=Recipe)
+def rebuild_deleted_recipe_cart_totals(sender, instance, **kwargs):
+    rebuild_totals_on_commit(get_cart_user_ids(instance))
+
+
+@receiver(post_save, sender=ShoppingList)
+def rebuild_saved_cart_totals(sender, instance, **kwargs):
+    rebuild_totals_on_commit([instance.user_id])
+
+
+@receiver(post_delete, sender=ShoppingList)
+def rebuild_deleted_cart_totals(sender, instance, origin=None, **kwargs):
+    if get_origin_model(origin) is ShoppingList:
+        rebuild_totals_on_commit([instance.user_id])
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def rebuild_saved_ingredient_cart_totals(sender, instance, **kwargs):
+    rebuild_totals_on_commit(get_cart_user_ids(instance.recipe_id))
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def rebuild_deleted_ingredient_cart_totals(sender, instance, origin=None,
+                                           **kwargs):
+    if get_origin_model(origin) is RecipeIngredient:
+        rebuild_totals_on_commit(get_cart_user_ids(instance.recipe_id))
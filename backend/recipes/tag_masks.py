@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Recipe
+
+TAG_MASK_BITS = 63
+
+
+def get_tag_bit(tag_id):
+    if 1 <= tag_id <= TAG_MASK_BITS:
+        return 1 << (tag_id - 1)
+    return 0
+
+
+def fits_tag_mask(tag_ids):
+    return all(1 <= tag_id <= TAG_MASK_BITS for tag_id in tag_ids)
+
+
+def get_tag_mask(tag_ids):
+    mask = 0
+    for tag_id in tag_ids:
+        mask |= get_tag_bit(tag_id)
+    return mask
+
+
+def filter_by_tag_mask(recipes, tag_ids):
+    return recipes.alias(
+        tag_match=F("tag_mask").bitand(get_tag_mask(tag_ids))
+    ).exclude(tag_match=0)
+
+
+def add_tags_to_mask(recipes, tag_ids):
+    mask = get_tag_mask(tag_ids)
+    if mask:
+        recipes.update(tag_mask=F("tag_mask").bitor(mask))
+
+
+def remove_tags_from_mask(recipes, tag_ids):
+    mask = get_tag_mask(tag_ids)
+    if mask:
+        filter_by_tag_mask(recipes, tag_ids).update(
+            tag_mask=F("tag_mask").bitand(~mask)
+        )
+
+
+def get_live_tag_masks():
+    masks = {}
+    for recipe_id, tag_id in Recipe.tags.through.objects.values_list(
+        "recipe_id", "tag_id"
+    ).iterator(chunk_size=2000):
+        masks[recipe_id] = masks.get(recipe_id, 0) | get_tag_bit(tag_id)
+    return masks
+
+
+@transaction.atomic
+def rebuild_tag_masks(batch_size=1000):
+    masks = get_live_tag_masks()
+    recipes = []
+    updated = 0
+    for recipe in Recipe.objects.only("id", "tag_mask").iterator(
+        chunk_size=batch_size
+    ):
+        mask = masks.get(recipe.id, 0)
+        if recipe.tag_mask != mask:
+            recipe.tag_mask = mask
+            recipes.append(recipe)
+    for start in range(0, len(recipes), batch_size):
+        updated += Recipe.objects.bulk_update(
+            recipes[start:start + batch_size], ["tag_mask"]
+        )
+    return updated
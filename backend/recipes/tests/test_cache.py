@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from foodgram.versions import VERSIONS_CACHE_VERSION, version_key
+from recipes.cache import GENERATION_NAME, bump_generation, get_generation
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RecipeCacheGenerationTest(TestCase):
+    def test_bump_changes_generation(self):
+        generation = get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation()
+        self.assertGreater(get_generation(), generation)
+
+    def test_culled_generation_does_not_reuse_old_values(self):
+        seen = {get_generation()}
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_generation()
+        seen.add(get_generation())
+        cache.delete(
+            version_key(GENERATION_NAME), version=VERSIONS_CACHE_VERSION)
+        self.assertGreater(get_generation(), max(seen))
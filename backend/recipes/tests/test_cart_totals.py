@@ -0,0 +1,87 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+from recipes.cart_totals import get_live_totals
+from recipes.models import Recipe, RecipeIngredient, ShoppingCartTotal
+from users.models import CustomUser
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class CartTotalsCascadeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.buyer = (
+            CustomUser.objects.create_user(
+                email=f"{name}@example.com", username=name,
+                first_name=name, last_name=name, password="password",
+            )
+            for name in ("author", "buyer")
+        )
+        cls.flour, cls.sugar = (
+            Ingredient.objects.create(name=name, measurement_unit="g")
+            for name in ("flour", "sugar")
+        )
+        cls.recipes = []
+        for author, amount in ((cls.author, 100), (cls.buyer, 50)):
+            recipe = Recipe.objects.create(
+                author=author, name="cake", text="text",
+                cooking_time=10, image="recipes/recipe.png",
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=cls.flour, amount=amount)
+            cls.recipes.append(recipe)
+        RecipeIngredient.objects.create(
+            recipe=cls.recipes[0], ingredient=cls.sugar, amount=10)
+
+    def setUp(self):
+        client = APIClient()
+        client.force_authenticate(self.buyer)
+        for recipe in self.recipes:
+            client.post(f"/api/recipes/{recipe.pk}/shopping_cart/")
+
+    def get_totals(self):
+        return {
+            (total.user_id, total.ingredient_id): total.amount
+            for total in ShoppingCartTotal.objects.all()
+        }
+
+    def test_totals_are_kept_by_api_requests(self):
+        self.assertEqual(self.get_totals(), {
+            (self.buyer.pk, self.flour.pk): 150,
+            (self.buyer.pk, self.sugar.pk): 10,
+        })
+
+    def test_deleting_author_updates_other_carts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.delete()
+        self.assertEqual(self.get_totals(), {
+            (self.buyer.pk, self.flour.pk): 50,
+        })
+        self.assertEqual(self.get_totals(), get_live_totals())
+
+    def test_editing_recipe_ingredients_updates_carts(self):
+        recipe_ingredient = RecipeIngredient.objects.get(
+            recipe=self.recipes[0], ingredient=self.flour)
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe_ingredient.amount = 200
+            recipe_ingredient.save()
+            RecipeIngredient.objects.filter(ingredient=self.sugar).delete()
+        self.assertEqual(self.get_totals(), {
+            (self.buyer.pk, self.flour.pk): 250,
+        })
+
+    def test_deleting_recipe_through_api_updates_carts(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(f"/api/recipes/{self.recipes[0].pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_totals(), get_live_totals())
+        self.assertEqual(self.get_totals(), {
+            (self.buyer.pk, self.flour.pk): 50,
+        })
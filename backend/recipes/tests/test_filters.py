@@ -0,0 +1,85 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from recipes.models import Favorite, Recipe
+from recipes.views import RecipeViewSet
+from tags.models import Tag
+from users.models import CustomUser
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+SORT_STEPS = {
+    "postgresql": ("Sort", "Unique", "HashAggregate", "GroupAggregate"),
+    "sqlite": ("TEMP B-TREE",),
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RecipeFilterPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="cook@example.com", username="cook",
+            first_name="Cook", last_name="Cook", password="password",
+        )
+        cls.tags = [
+            Tag.objects.create(name="breakfast", color="#000001",
+                               slug="breakfast"),
+            Tag.objects.create(id=100, name="dinner", color="#000002",
+                               slug="dinner"),
+        ]
+        for i in range(20):
+            recipe = Recipe.objects.create(
+                author=cls.user, name=f"recipe{i}", text="text" * 100,
+                cooking_time=10, image="recipes/recipe.png",
+            )
+            recipe.tags.set(cls.tags[:i % 2 + 1])
+            if i % 2:
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+
+    def get_queryset(self, query, user=None):
+        request = Request(APIRequestFactory().get("/api/recipes/", query))
+        request.user = user or AnonymousUser()
+        view = RecipeViewSet(
+            request=request, action="list", format_kwarg=None)
+        return view.filter_queryset(view.get_queryset())
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset[:10].explain()
+
+    def assert_no_sort(self, queryset):
+        self.assertNotIn("DISTINCT", str(queryset.query))
+        plan = self.explain(queryset)
+        for step in SORT_STEPS.get(connection.vendor, ()):
+            self.assertNotIn(step, plan)
+
+    def test_tag_filter_uses_semi_join(self):
+        queryset = self.get_queryset({"tags": ["breakfast", "dinner"]})
+        self.assertEqual(queryset.count(), 20)
+        self.assert_no_sort(queryset)
+
+    def test_tag_outside_mask_uses_exists(self):
+        queryset = self.get_queryset({"tags": ["dinner"]})
+        self.assertEqual(queryset.count(), 10)
+        self.assertIn("EXISTS", str(queryset.query))
+        self.assert_no_sort(queryset)
+
+    def test_recipes_by_tag_use_tag_recipe_index(self):
+        plan = self.explain(
+            Recipe.tags.through.objects.filter(
+                tag_id=self.tags[1].pk).values("recipe_id")
+        )
+        self.assertIn("recipes_recipe_tags_tag_recipe_idx", plan)
+
+    def test_favorite_filter_uses_semi_join(self):
+        queryset = self.get_queryset(
+            {"is_favorited": "1", "tags": ["dinner"]}, self.user)
+        self.assertEqual(queryset.count(), 10)
+        self.assert_no_sort(queryset)
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from recipes.images import claim_jobs
+from recipes.models import ImageJob, Recipe
+from users.models import CustomUser
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(
+    CACHES=LOCAL_CACHE, IMAGE_JOB_TIMEOUT=60, IMAGE_JOB_MAX_ATTEMPTS=3)
+class ClaimJobsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            email="author@example.com", username="author",
+            first_name="author", last_name="author", password="password",
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author, name="cake", text="text",
+            cooking_time=10, image="recipes/recipe.png",
+        )
+
+    def create_stale_job(self, attempts):
+        job = ImageJob.objects.create(
+            recipe=self.recipe, image="recipes/recipe.png",
+            status=ImageJob.PROCESSING, attempts=attempts,
+        )
+        ImageJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=5))
+        return job
+
+    def test_reclaims_stale_job_under_attempt_limit(self):
+        job = self.create_stale_job(attempts=1)
+        self.assertEqual([claimed.pk for claimed in claim_jobs(10)], [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.PROCESSING)
+        self.assertEqual(job.attempts, 2)
+
+    def test_fails_stale_job_over_attempt_limit(self):
+        job = self.create_stale_job(attempts=3)
+        self.assertEqual(claim_jobs(10), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.FAILED)
+        self.assertNotEqual(job.error, "")
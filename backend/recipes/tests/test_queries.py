@@ -0,0 +1,100 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingList
+from tags.cache import get_cached_tags, invalidate_tags
+from tags.models import Tag
+from users.models import CustomUser, UserFollow
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RecipeQueryCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            CustomUser.objects.create_user(
+                email=f"author{i}@example.com", username=f"author{i}",
+                first_name="Author", last_name=str(i), password="password",
+            )
+            for i in range(3)
+        ]
+        cls.user = cls.authors[0]
+        tags = [
+            Tag.objects.create(
+                name=f"tag{i}", color=f"#00000{i}", slug=f"tag{i}")
+            for i in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=f"ingredient{i}",
+                                      measurement_unit="g")
+            for i in range(5)
+        ]
+        for i in range(30):
+            recipe = Recipe.objects.create(
+                author=cls.authors[i % 3], name=f"recipe{i}", text="text",
+                cooking_time=10, image="recipes/recipe.png",
+            )
+            recipe.tags.set(tags[:i % 3 + 1])
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                 amount=i + 1)
+                for ingredient in ingredients[:i % 5 + 1]
+            )
+            if i % 2:
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+            if i % 3:
+                ShoppingList.objects.create(user=cls.user, recipe=recipe)
+        UserFollow.objects.create(user_from=cls.user, user_to=cls.authors[1])
+        cls.recipe = recipe
+
+    def setUp(self):
+        self.client = APIClient()
+        invalidate_tags()
+        get_cached_tags()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_list_queries_do_not_depend_on_page_size(self):
+        for user in (None, self.user):
+            self.client.force_authenticate(user)
+            with self.subTest(authenticated=user is not None):
+                self.assertEqual(
+                    self.count_queries("/api/recipes/?limit=2"),
+                    self.count_queries("/api/recipes/?limit=30"),
+                )
+
+    def test_list_query_count(self):
+        with self.assertNumQueries(4):
+            self.client.get("/api/recipes/?limit=30")
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(5):
+            self.client.get("/api/recipes/?limit=30")
+
+    def test_list_flags(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get("/api/recipes/?limit=30")
+        for item in response.data["results"]:
+            recipe_number = int(item["name"].removeprefix("recipe"))
+            self.assertEqual(item["is_favorited"], bool(recipe_number % 2))
+            self.assertEqual(
+                item["is_in_shopping_cart"], bool(recipe_number % 3))
+
+    def test_detail_query_count(self):
+        url = f"/api/recipes/{self.recipe.pk}/"
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertTrue(response.data["is_favorited"])
+        with self.assertNumQueries(2):
+            self.client.get(url)
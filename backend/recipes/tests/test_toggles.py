@@ -0,0 +1,97 @@
+import threading
+from collections import Counter
+
+from django.db import connection
+from django.test import (
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
+from rest_framework.test import APIClient
+
+from ingredients.models import Ingredient
+from recipes.models import (
+    Favorite,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCartTotal,
+    ShoppingList,
+)
+from users.models import CustomUser
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+THREADS = 8
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class ConcurrentToggleTest(TransactionTestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="cook@example.com", username="cook",
+            first_name="Cook", last_name="Cook", password="password",
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user, name="recipe", text="text",
+            cooking_time=10, image="recipes/recipe.png",
+        )
+        self.ingredient = Ingredient.objects.create(
+            name="flour", measurement_unit="g")
+        RecipeIngredient.objects.create(
+            recipe=self.recipe, ingredient=self.ingredient, amount=100)
+
+    def send_concurrently(self, method, url):
+        barrier = threading.Barrier(THREADS)
+        statuses = []
+
+        def send():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                barrier.wait()
+                statuses.append(getattr(client, method)(url).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=send) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return Counter(statuses)
+
+    def test_concurrent_favorite(self):
+        url = f"/api/recipes/{self.recipe.pk}/favorite/"
+        self.assertEqual(
+            self.send_concurrently("post", url), {201: 1, 400: THREADS - 1})
+        self.assertEqual(
+            Favorite.objects.filter(user=self.user).count(), 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+        self.assertEqual(
+            self.send_concurrently("delete", url), {204: 1, 400: THREADS - 1})
+        self.assertFalse(Favorite.objects.exists())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_concurrent_shopping_cart(self):
+        url = f"/api/recipes/{self.recipe.pk}/shopping_cart/"
+        self.assertEqual(
+            self.send_concurrently("post", url), {201: 1, 400: THREADS - 1})
+        self.assertEqual(
+            ShoppingList.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(
+            list(ShoppingCartTotal.objects.values_list(
+                "ingredient", "amount")),
+            [(self.ingredient.pk, 100)],
+        )
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.in_carts_count, 1)
+        self.assertEqual(
+            self.send_concurrently("delete", url), {204: 1, 400: THREADS - 1})
+        self.assertFalse(ShoppingList.objects.exists())
+        self.assertFalse(ShoppingCartTotal.objects.exists())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.in_carts_count, 0)
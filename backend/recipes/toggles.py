@@ -0,0 +1,47 @@
+from django.db.models import F
+
+from .counters import COUNTER_FIELDS
+from .models import Recipe
+from foodgram.db import link_rows, quote, unlink_rows
+from foodgram.versions import bump_version, user_version_name
+
+
+def change_counters(model, recipe_ids, delta):
+    if recipe_ids:
+        field = COUNTER_FIELDS[model]
+        Recipe.objects.filter(pk__in=recipe_ids).update(
+            **{field: F(field) + delta})
+
+
+def add_recipes(model, user, recipe_ids):
+    added = link_rows(model, "user", user.pk, "recipe", recipe_ids)
+    change_counters(model, added, 1)
+    if added:
+        bump_version(user_version_name(user.pk))
+    return added
+
+
+def remove_recipes(model, user, recipe_ids=None):
+    removed = unlink_rows(model, "user", user.pk, "recipe", recipe_ids)
+    change_counters(model, removed, -1)
+    if removed:
+        bump_version(user_version_name(user.pk))
+    return removed
+
+
+def add_recipe(model, user, recipe_id):
+    if not link_rows(model, "user", user.pk, "recipe", [recipe_id]):
+        return None
+    bump_version(user_version_name(user.pk))
+    field = quote(COUNTER_FIELDS[model])
+    recipes = Recipe.objects.raw(
+        f"UPDATE {quote(Recipe._meta.db_table)} "
+        f"SET {field} = {field} + 1 WHERE id = %s "
+        f"RETURNING id, name, image, image_renditions, cooking_time",
+        [recipe_id],
+    )
+    return recipes[0]
+
+
+def remove_recipe(model, user, recipe_id):
+    return bool(remove_recipes(model, user, [recipe_id]))
@@ -0,0 +1,86 @@
+import base64
+import binascii
+import re
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, UnidentifiedImageError
+from rest_framework import serializers
+
+BASE64_MARKER = ";base64,"
+BASE64_CHUNK_SIZE = 64 * 1024
+DATA_URI_HEADER = re.compile(r"^data:image/([a-z0-9.+-]+)$")
+
+
+def get_size_error():
+    return serializers.ValidationError(
+        "Размер изображения не должен превышать "
+        f"{settings.RECIPE_IMAGE_MAX_SIZE // (1024 * 1024)} МБ."
+    )
+
+
+def decode_base64(data, start, output):
+    max_size = settings.RECIPE_IMAGE_MAX_SIZE
+    if (len(data) - start) // 4 * 3 > max_size + 3:
+        raise get_size_error()
+    size = 0
+    leftover = ""
+    for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+        chunk = leftover + "".join(
+            data[offset:offset + BASE64_CHUNK_SIZE].split())
+        end = len(chunk) // 4 * 4
+        leftover = chunk[end:]
+        decoded = base64.b64decode(chunk[:end], validate=True)
+        size += len(decoded)
+        if size > max_size:
+            raise get_size_error()
+        output.write(decoded)
+    if leftover:
+        raise binascii.Error("Incorrect padding")
+    return size
+
+
+def decode_data_uri(data):
+    marker = data.find(BASE64_MARKER)
+    match = DATA_URI_HEADER.match(data[:marker]) if marker > 0 else None
+    if match is None:
+        raise serializers.ValidationError(
+            "Изображение должно быть передано в формате data:image/*;base64.")
+    output = SpooledTemporaryFile(
+        max_size=settings.RECIPE_IMAGE_SPOOL_SIZE)
+    try:
+        size = decode_base64(data, marker + len(BASE64_MARKER), output)
+    except binascii.Error:
+        output.close()
+        raise serializers.ValidationError(
+            "Изображение содержит некорректные данные base64.")
+    except serializers.ValidationError:
+        output.close()
+        raise
+    output.seek(0)
+    return UploadedFile(
+        output,
+        name=f"image.{match.group(1)}",
+        content_type=f"image/{match.group(1)}",
+        size=size,
+    )
+
+
+def check_image_limits(file):
+    if file.size > settings.RECIPE_IMAGE_MAX_SIZE:
+        raise get_size_error()
+    max_dimension = settings.RECIPE_IMAGE_MAX_DIMENSION
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        raise serializers.ValidationError(
+            "Загрузите корректное изображение.")
+    finally:
+        file.seek(0)
+    if width > max_dimension or height > max_dimension:
+        raise serializers.ValidationError(
+            "Ширина и высота изображения не должны превышать "
+            f"{max_dimension} пикселей."
+        )
@@ -1,13 +1,31 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import RecipeViewSet, ShoppingCartView, FavoriteView
+from .views import (
+    FavoriteBatchView,
+    FavoriteView,
+    RecipeViewSet,
+    ShoppingCartBatchView,
+    ShoppingCartClearView,
+    ShoppingCartView,
+)
 
 
 router = DefaultRouter()
 router.register("", RecipeViewSet, basename="recipes")
 
 urlpatterns = [
+    path(
+        "shopping_cart/",
+        ShoppingCartBatchView.as_view(),
+        name="shopping_cart_batch",
+    ),
+    path(
+        "shopping_cart/clear/",
+        ShoppingCartClearView.as_view(),
+        name="shopping_cart_clear",
+    ),
+    path("favorite/", FavoriteBatchView.as_view(), name="favorite_batch"),
     path("", include(router.urls)),
     path(
         "<int:recipe_pk>/shopping_cart/",
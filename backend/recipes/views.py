@@ -1,31 +1,57 @@
-from django.db.models import Prefetch, Sum
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Value
+from django.http import Http404, StreamingHttpResponse
 
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
+from .cache import get_recipe_data
+from .cart_totals import (
+    add_recipe_to_totals,
+    add_recipes_to_totals,
+    clear_totals,
+    remove_recipe_from_totals,
+    remove_recipes_from_totals,
+)
+from .exporters import WRITERS, get_shopping_list_items
 from .filters import RecipeFilter
 from .models import Recipe, ShoppingList, Favorite, RecipeIngredient
+from .parsers import MultiPartJSONParser
 from .permissions import IsOwnerOrReadOnly
+from .toggles import add_recipe, add_recipes, remove_recipe, remove_recipes
+from .tag_masks import filter_by_tag_mask, fits_tag_mask
 from .serializers import (
     SimpleRecipeSerializer,
     RecipeReadSerializer,
     RecipeWriteSerializer,
 )
 from .pagination import LimitPageNumberPagination
+from foodgram.conditional import conditional
+from foodgram.pagination import KeysetPaginationMixin
+from foodgram.serializers import IdListSerializer, get_batch_results
 from foodgram.utils import validate_pk
+from tags.cache import get_tag_ids_by_slugs
+from tags.models import Tag
+from users.models import UserFollow
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     pagination_class = LimitPageNumberPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    parser_classes = (JSONParser, MultiPartJSONParser, FormParser)
+    ordering_query_param = "ordering"
+    orderings = {
+        "popular": ("-favorites_count", "-id"),
+    }
+    default_ordering = ("id",)
 
     def get_serializer_class(self):
         if self.action == "list" or self.action == "retrieve":
@@ -37,48 +63,116 @@ class RecipeViewSet(viewsets.ModelViewSet):
         context.update({"request": self.request})
         return context
 
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "list" and args:
+            kwargs.setdefault("context", self.get_serializer_context())
+            kwargs["context"]["subscribed_ids"] = self.get_subscribed_ids(
+                args[0])
+        return super().get_serializer(*args, **kwargs)
+
+    def get_subscribed_ids(self, recipes):
+        user = self.request.user
+        if not user.is_authenticated:
+            return set()
+        author_ids = {recipe.author_id for recipe in recipes}
+        return set(
+            UserFollow.objects.filter(
+                user_from=user, user_to__in=author_ids
+            ).values_list("user_to", flat=True)
+        )
+
     def get_queryset(self):
         queryset = (
             super()
             .get_queryset()
-            .order_by("id")
+            .order_by(*self.get_ordering())
+            .select_related("author")
             .prefetch_related(
                 Prefetch(
                     "recipe_ingredients",
                     queryset=RecipeIngredient.objects.select_related(
                         "ingredient"),
-                )
+                ),
+                Prefetch("tags", queryset=Tag.objects.only("id")),
             )
         )
+        queryset = self.annotate_user_flags(queryset)
         queryset = self.filter_by_tags(queryset)
         return self.filter_by_favorites_and_cart(queryset)
 
+    def get_ordering(self):
+        return self.orderings.get(
+            self.request.query_params.get(self.ordering_query_param),
+            self.default_ordering,
+        )
+
+    def annotate_user_flags(self, queryset):
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+            )
+        return queryset.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingList.objects.filter(user=user, recipe=OuterRef("pk"))
+            ),
+        )
+
     def filter_by_tags(self, queryset):
         tag_slugs = self.request.query_params.getlist("tags")
-        if tag_slugs:
-            queryset = queryset.filter(tags__slug__in=tag_slugs).distinct()
-        return queryset
+        if not tag_slugs:
+            return queryset
+        tag_ids = get_tag_ids_by_slugs(tag_slugs)
+        if fits_tag_mask(tag_ids):
+            return filter_by_tag_mask(queryset, tag_ids)
+        return queryset.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe_id=OuterRef("pk"), tag_id__in=tag_ids
+                )
+            )
+        )
 
     def filter_by_favorites_and_cart(self, queryset):
         user = self.request.user
-        is_favorited = self.request.query_params.get("is_favorited")
-        is_in_shopping_cart = self.request.query_params.get(
-            "is_in_shopping_cart")
-
-        if user.is_authenticated:
-            if is_favorited:
-                if is_favorited == "1":
-                    queryset = queryset.filter(in_favorites__user=user)
-                elif is_favorited == "0":
-                    queryset = queryset.exclude(in_favorites__user=user)
-            if is_in_shopping_cart:
-                if is_in_shopping_cart == "1":
-                    queryset = queryset.filter(in_shopping_list__user=user)
-                elif is_in_shopping_cart == "0":
-                    queryset = queryset.exclude(in_shopping_list__user=user)
-        elif is_favorited == "1" or is_in_shopping_cart == "1":
-            queryset = queryset.none()
-        return queryset.distinct()
+        for param in ("is_favorited", "is_in_shopping_cart"):
+            value = self.request.query_params.get(param)
+            if value not in ("0", "1"):
+                continue
+            if not user.is_authenticated:
+                if value == "1":
+                    queryset = queryset.none()
+                continue
+            queryset = queryset.filter(**{param: value == "1"})
+        return queryset
+
+    def get_recipe_pk(self):
+        try:
+            return int(self.kwargs["pk"])
+        except ValueError:
+            raise Http404
+
+    def get_recipe_versions(self, request, *args, **kwargs):
+        updated_at = Recipe.objects.filter(
+            pk=self.get_recipe_pk()
+        ).values_list("updated_at", flat=True).first()
+        if updated_at is None:
+            return None
+        return (
+            ["tags", "ingredients", "users"],
+            [int(updated_at.timestamp() * 1_000_000)],
+        )
+
+    @conditional(get_recipe_versions, per_user=True)
+    def retrieve(self, request, *args, **kwargs):
+        data = get_recipe_data(self.get_recipe_pk(), request)
+        if data is None:
+            raise Http404
+        return Response(data)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -100,134 +194,158 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated]
     )
     def download_shopping_cart(self, request, *args, **kwargs):
-        shopping_list_items = ShoppingList.objects.filter(user=request.user)
-        ingredients = shopping_list_items.values(
-            "recipe__recipe_ingredients__ingredient__name",
-            "recipe__recipe_ingredients__ingredient__measurement_unit",
-        ).annotate(total_amount=Sum("recipe__recipe_ingredients__amount"))
-
-        content = "\n".join([
-            "{} - {} {}".format(
-                item["recipe__recipe_ingredients__ingredient__name"],
-                item["total_amount"],
-                item[
-                    "recipe__recipe_ingredients__ingredient__measurement_unit"]
+        file_format = request.query_params.get("file_format", "txt")
+        writer_class = WRITERS.get(file_format)
+        if writer_class is None:
+            return Response(
+                {"detail": "Unsupported file format. Use one of: {}.".format(
+                    ", ".join(WRITERS))},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            for item in ingredients
-        ])
-
-        response = HttpResponse(content, content_type="text/plain")
+        writer = writer_class()
+        response = StreamingHttpResponse(
+            writer.write(get_shopping_list_items(request.user)),
+            content_type=writer.content_type,
+        )
         response["Content-Disposition"] = (
-            'attachment; filename="shopping_list.txt"')
+            'attachment; filename="shopping_list.{}"'.format(
+                writer.extension))
         return response
 
 
-class ShoppingCartView(APIView):
+class RecipeRelationView(APIView):
     permission_classes = [IsAuthenticated]
+    model = None
+    already_added_message = None
+    not_added_message = None
 
+    @transaction.atomic
     def post(self, request, recipe_pk=None):
         try:
             pk = validate_pk(recipe_pk)
-            recipe = Recipe.objects.get(pk=pk)
         except ValidationError as e:
             return Response(
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST)
-        except Recipe.DoesNotExist:
-            return Response(
-                {"detail": "Recipe does not exist."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
 
-        shopping_list_item, created = ShoppingList.objects.get_or_create(
-            user=request.user, recipe=recipe
-        )
+        recipe = add_recipe(self.model, request.user, pk)
+        if recipe is None:
+            return self.failure_response(pk, self.already_added_message)
 
-        if created:
-            serializer = SimpleRecipeSerializer(
-                recipe, context={"request": request})
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(
-            {"detail": "Already in shopping cart"},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+        self.recipe_added(request.user, recipe)
+        serializer = SimpleRecipeSerializer(
+            recipe, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
     def delete(self, request, recipe_pk=None):
         try:
             pk = validate_pk(recipe_pk)
-            recipe = Recipe.objects.get(pk=pk)
         except ValidationError as e:
             return Response(
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST)
-        except Recipe.DoesNotExist:
-            return Response(
-                {"detail": "Recipe does not exist."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
 
-        shopping_list_item = ShoppingList.objects.filter(
-            user=request.user, recipe=recipe
-        )
-        if shopping_list_item.exists():
-            shopping_list_item.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+        if not remove_recipe(self.model, request.user, pk):
+            return self.failure_response(pk, self.not_added_message)
+
+        self.recipe_removed(request.user, pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def failure_response(self, pk, detail):
+        if not Recipe.objects.filter(pk=pk).exists():
+            detail = "Recipe does not exist."
         return Response(
-            {"detail": "Recipe was not in shopping cart"},
+            {"detail": detail},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    def recipe_added(self, user, recipe):
+        pass
 
-class FavoriteView(APIView):
+    def recipe_removed(self, user, recipe_id):
+        pass
+
+
+class RecipeRelationBatchView(APIView):
     permission_classes = [IsAuthenticated]
+    model = None
 
-    def post(self, request, recipe_pk=None):
-        try:
-            pk = validate_pk(recipe_pk)
-            recipe = Recipe.objects.get(pk=pk)
-        except ValidationError as e:
-            return Response(
-                {"detail": str(e)},
-                status=status.HTTP_400_BAD_REQUEST)
-        except Recipe.DoesNotExist:
-            return Response(
-                {"detail": "Recipe does not exist."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+    @transaction.atomic
+    def post(self, request):
+        recipe_ids = self.get_recipe_ids(request)
+        added = add_recipes(self.model, request.user, recipe_ids)
+        self.recipes_added(request.user, added)
+        return self.results_response(
+            recipe_ids, added, "added", "already_added")
 
-        favorite_item, created = Favorite.objects.get_or_create(
-            user=request.user, recipe=recipe
-        )
+    @transaction.atomic
+    def delete(self, request):
+        recipe_ids = self.get_recipe_ids(request)
+        removed = remove_recipes(self.model, request.user, recipe_ids)
+        self.recipes_removed(request.user, removed)
+        return self.results_response(
+            recipe_ids, removed, "removed", "not_added")
 
-        if created:
-            serializer = SimpleRecipeSerializer(
-                recipe, context={"request": request})
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(
-            {"detail": "Already in favorites"},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    def get_recipe_ids(self, request):
+        serializer = IdListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data["ids"]
 
-    def delete(self, request, recipe_pk=None):
-        try:
-            pk = validate_pk(recipe_pk)
-            recipe = Recipe.objects.get(pk=pk)
-        except ValidationError as e:
-            return Response(
-                {"detail": str(e)},
-                status=status.HTTP_400_BAD_REQUEST)
-        except Recipe.DoesNotExist:
-            return Response(
-                {"detail": "Recipe does not exist."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+    def results_response(self, recipe_ids, changed, changed_status,
+                         unchanged_status):
+        unchanged = [pk for pk in recipe_ids if pk not in changed]
+        existing = set(
+            Recipe.objects.filter(pk__in=unchanged).values_list(
+                "id", flat=True)
+        ) if unchanged else set()
+        return Response(get_batch_results(
+            recipe_ids, changed, existing, changed_status, unchanged_status))
 
-        favorite_item = Favorite.objects.filter(
-            user=request.user, recipe=recipe)
-        if favorite_item.exists():
-            favorite_item.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(
-            {"detail": "Recipe was not in favorites"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+    def recipes_added(self, user, recipe_ids):
+        pass
+
+    def recipes_removed(self, user, recipe_ids):
+        pass
+
+
+class ShoppingCartView(RecipeRelationView):
+    model = ShoppingList
+    already_added_message = "Already in shopping cart"
+    not_added_message = "Recipe was not in shopping cart"
+
+    def recipe_added(self, user, recipe):
+        add_recipe_to_totals(user, recipe)
+
+    def recipe_removed(self, user, recipe_id):
+        remove_recipe_from_totals(user, recipe_id)
+
+
+class FavoriteView(RecipeRelationView):
+    model = Favorite
+    already_added_message = "Already in favorites"
+    not_added_message = "Recipe was not in favorites"
+
+
+class ShoppingCartBatchView(RecipeRelationBatchView):
+    model = ShoppingList
+
+    def recipes_added(self, user, recipe_ids):
+        add_recipes_to_totals(user, recipe_ids)
+
+    def recipes_removed(self, user, recipe_ids):
+        remove_recipes_from_totals(user, recipe_ids)
+
+
+class ShoppingCartClearView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @transaction.atomic
+    def delete(self, request):
+        remove_recipes(ShoppingList, request.user)
+        clear_totals(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FavoriteBatchView(RecipeRelationBatchView):
+    model = Favorite
@@ -0,0 +1,42 @@
+from .models import Tag
+from foodgram.metrics import record_cache
+from foodgram.versions import get_versions
+from .serializers import TagSerializer
+
+_tags = None
+_tags_version = None
+
+
+def get_tags_version():
+    return get_versions("tags")["tags"]
+
+
+def get_cached_tags():
+    global _tags, _tags_version
+    version = get_tags_version()
+    if version != _tags_version:
+        invalidate_tags()
+    record_cache("tags", _tags is not None)
+    if _tags is None:
+        _tags_version = version
+        _tags = {
+            tag.id: TagSerializer(tag).data
+            for tag in Tag.objects.order_by("id")
+        }
+    return _tags
+
+
+def get_cached_tag(tag_id):
+    return get_cached_tags().get(tag_id)
+
+
+def get_tag_ids_by_slugs(slugs):
+    slugs = set(slugs)
+    return [
+        tag["id"] for tag in get_cached_tags().values() if tag["slug"] in slugs
+    ]
+
+
+def invalidate_tags():
+    global _tags
+    _tags = None
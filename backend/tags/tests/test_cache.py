@@ -0,0 +1,52 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from foodgram.versions import set_version
+from tags.cache import get_cached_tags, get_tag_ids_by_slugs, invalidate_tags
+from tags.models import Tag
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class TagCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(
+            name="breakfast", color="#000001", slug="breakfast")
+
+    def setUp(self):
+        invalidate_tags()
+
+    def change_in_other_process(self, **fields):
+        Tag.objects.filter(pk=self.tag.pk).update(**fields)
+        set_version("tags")
+
+    def test_reloads_when_shared_version_changes(self):
+        self.assertEqual(get_cached_tags()[self.tag.pk]["name"], "breakfast")
+        self.change_in_other_process(name="brunch")
+        self.assertEqual(get_cached_tags()[self.tag.pk]["name"], "brunch")
+
+    def test_keeps_tags_while_version_is_unchanged(self):
+        get_cached_tags()
+        Tag.objects.filter(pk=self.tag.pk).update(name="brunch")
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_cached_tags()[self.tag.pk]["name"], "breakfast")
+            self.assertEqual(get_tag_ids_by_slugs(["unknown"]), [])
+
+    def test_list_is_not_served_stale_under_new_etag(self):
+        client = APIClient()
+        etag = client.get("/api/tags/")["ETag"]
+        self.change_in_other_process(name="brunch", slug="brunch")
+        response = client.get("/api/tags/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["slug"], "brunch")
+        self.assertEqual(
+            client.get(
+                "/api/tags/", HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code,
+            304,
+        )
@@ -1,5 +1,9 @@
+from django.http import Http404
 from rest_framework import viewsets, permissions
+from rest_framework.response import Response
 
+from foodgram.conditional import conditional
+from .cache import get_cached_tag, get_cached_tags
 from .models import Tag
 from .serializers import TagSerializer
 
@@ -9,3 +13,20 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     permission_classes = [permissions.AllowAny]
     pagination_class = None
+
+    def get_versions(self, request, *args, **kwargs):
+        return ["tags"], []
+
+    @conditional(get_versions)
+    def list(self, request, *args, **kwargs):
+        return Response(list(get_cached_tags().values()))
+
+    @conditional(get_versions)
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            tag = get_cached_tag(int(kwargs["pk"]))
+        except ValueError:
+            tag = None
+        if tag is None:
+            raise Http404
+        return Response(tag)
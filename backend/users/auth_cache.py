@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+from foodgram.metrics import record_cache
+
+User = get_user_model()
+
+SNAPSHOT_USER_FIELDS = (
+    "id", "email", "username", "first_name", "last_name",
+    "is_active", "is_staff", "is_superuser",
+)
+
+
+class TokenCache:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return snapshot
+
+    def set(self, key, snapshot):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(
+    settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def get_fields(model, names=None):
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if names is None or field.attname in names
+    ]
+
+
+def make_snapshot(user, token):
+    return (
+        tuple(
+            getattr(user, name)
+            for name in get_fields(User, SNAPSHOT_USER_FIELDS)
+        ),
+        tuple(getattr(token, name) for name in get_fields(Token)),
+    )
+
+
+def restore_snapshot(snapshot):
+    user_values, token_values = snapshot
+    user = User.from_db(
+        "default", get_fields(User, SNAPSHOT_USER_FIELDS), user_values)
+    token = Token.from_db("default", get_fields(Token), token_values)
+    token.user = user
+    return user, token
+
+
+def shared_cache_key(key):
+    return "auth-token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_credentials(key):
+    snapshot = token_cache.get(key)
+    if snapshot is None and settings.AUTH_TOKEN_CACHE_SHARED:
+        snapshot = cache.get(shared_cache_key(key))
+        if snapshot is not None:
+            token_cache.set(key, snapshot)
+    record_cache("auth_tokens", snapshot is not None)
+    if snapshot is None:
+        return None
+    return restore_snapshot(snapshot)
+
+
+def cache_credentials(user, token):
+    snapshot = make_snapshot(user, token)
+    token_cache.set(token.key, snapshot)
+    if settings.AUTH_TOKEN_CACHE_SHARED:
+        cache.set(shared_cache_key(token.key), snapshot,
+                  timeout=settings.AUTH_TOKEN_CACHE_TTL)
+
+
+def invalidate_tokens(keys):
+    keys = list(keys)
+    for key in keys:
+        token_cache.delete(key)
+    if keys and settings.AUTH_TOKEN_CACHE_SHARED:
+        cache.delete_many([shared_cache_key(key) for key in keys])
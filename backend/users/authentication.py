@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+
+from .auth_cache import cache_credentials, get_cached_credentials
+
+User = get_user_model()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None or request.method in SAFE_METHODS:
+            return result
+        user, token = result
+        user = User.objects.filter(pk=user.pk, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User inactive or deleted.")
+        token.user = user
+        return user, token
+
+    def authenticate_credentials(self, key):
+        credentials = get_cached_credentials(key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            cache_credentials(*credentials)
+        return credentials
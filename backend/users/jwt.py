@@ -0,0 +1,179 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import (
+    AccessToken,
+    RefreshToken,
+    UntypedToken,
+)
+
+from .models import RevokedToken
+
+User = get_user_model()
+
+USER_CLAIMS = ("email", "username", "first_name", "last_name", "is_staff")
+ISSUED_AT_CLAIM = "issued_at"
+
+
+class DenyList:
+    def __init__(self):
+        self.jtis = {}
+        self.users = {}
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if (not force and self.synced_at is not None
+                and now - self.synced_at < settings.JWT_DENY_LIST_INTERVAL):
+            return
+        with self.lock:
+            jtis = {}
+            users = {}
+            rows = RevokedToken.objects.filter(
+                expires_at__gt=timezone.now()
+            ).values_list("jti", "user_pk", "revoked_at", "expires_at")
+            for jti, user_pk, revoked_at, expires_at in rows:
+                expires_at = expires_at.timestamp()
+                if jti:
+                    jtis[jti] = expires_at
+                else:
+                    previous = users.get(user_pk, (0, 0))
+                    users[user_pk] = (
+                        max(previous[0], revoked_at),
+                        max(previous[1], expires_at),
+                    )
+            self.jtis = jtis
+            self.users = users
+            self.synced_at = now
+
+    def is_revoked(self, token):
+        self.sync()
+        if token.get(api_settings.JTI_CLAIM) in self.jtis:
+            return True
+        entry = self.users.get(token.get(api_settings.USER_ID_CLAIM))
+        return entry is not None and token.get(ISSUED_AT_CLAIM, 0) < entry[0]
+
+
+deny_list = DenyList()
+
+
+def revoke_token(token):
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    RevokedToken.objects.create(
+        jti=token[api_settings.JTI_CLAIM],
+        revoked_at=time.time(),
+        expires_at=datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+    )
+    deny_list.sync(force=True)
+
+
+def revoke_user_tokens(user_pk):
+    RevokedToken.objects.create(
+        user_pk=user_pk,
+        revoked_at=time.time(),
+        expires_at=timezone.now() + api_settings.REFRESH_TOKEN_LIFETIME,
+    )
+    deny_list.sync(force=True)
+
+
+def check_not_revoked(token):
+    if deny_list.is_revoked(token):
+        raise TokenError("Token is revoked")
+
+
+def add_user_claims(token, user, issued_at=None):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[ISSUED_AT_CLAIM] = (
+        round(time.time(), 3) if issued_at is None else issued_at)
+    return token
+
+
+def get_user_from_claims(token):
+    try:
+        values = {claim: token[claim] for claim in USER_CLAIMS}
+        values["id"] = token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken("Token contained no recognizable user")
+    values["is_active"] = True
+    fields = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        "default", fields, [values[field] for field in fields])
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is None or request.method in SAFE_METHODS:
+            return result
+        user, token = result
+        user = User.objects.filter(pk=user.pk, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User is inactive or deleted")
+        return user, token
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if deny_list.is_revoked(token):
+            raise InvalidToken("Token is revoked")
+        return token
+
+    def get_user(self, validated_token):
+        return get_user_from_claims(validated_token)
+
+
+class JWTObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(RefreshToken.for_user(user), user)
+
+
+class JWTRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs["refresh"])
+        check_not_revoked(refresh)
+        user = User.objects.filter(
+            pk=refresh[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise TokenError("User is inactive or deleted")
+        access = add_user_claims(
+            AccessToken.for_user(user), user, refresh.get(ISSUED_AT_CLAIM))
+        return {"access": str(access)}
+
+
+class JWTVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        check_not_revoked(UntypedToken(attrs["token"]))
+        return {}
+
+
+class JWTLogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+    access = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        tokens = [RefreshToken(attrs["refresh"])]
+        if "access" in attrs:
+            tokens.append(AccessToken(attrs["access"]))
+        for token in tokens:
+            revoke_token(token)
+        return {}
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-18 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(blank=True, max_length=255)),
+                ('user_pk', models.BigIntegerField(blank=True, null=True)),
+                ('revoked_at', models.FloatField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -37,3 +37,13 @@ class UserFollow(models.Model):
 
     def __str__(self):
         return f"{self.user_from} follows {self.user_to}"
+
+
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, blank=True)
+    user_pk = models.BigIntegerField(null=True, blank=True)
+    revoked_at = models.FloatField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti or f"user {self.user_pk}"
@@ -20,6 +20,9 @@ class CustomUserSerializer(serializers.ModelSerializer):
                   "first_name", "last_name", "is_subscribed"]
 
     def get_is_subscribed(self, obj):
+        subscribed_ids = self.context.get("subscribed_ids")
+        if subscribed_ids is not None:
+            return obj.id in subscribed_ids
         request_user = self.context.get("request").user
         return (
             UserFollow.objects.filter(
@@ -119,19 +122,25 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
         ]
 
     def get_recipes(self, obj):
-        recipes_limit = self.context.get("recipes_limit")
-        recipes_qs = obj.recipes.all()
-        if recipes_limit:
-            try:
-                recipes_limit = int(recipes_limit)
-                recipes_qs = recipes_qs[:recipes_limit]
-            except ValueError:
-                pass
+        if hasattr(obj, "preview_recipes"):
+            recipes_qs = obj.preview_recipes
+        else:
+            recipes_limit = self.context.get("recipes_limit")
+            recipes_qs = obj.recipes.all()
+            if recipes_limit:
+                try:
+                    recipes_limit = int(recipes_limit)
+                    recipes_qs = recipes_qs[:recipes_limit]
+                except ValueError:
+                    pass
         context = self.context.copy()
         return RecipeBriefSerializer(recipes_qs, many=True, context=context
                                      ).data
 
     def get_is_subscribed(self, obj):
+        subscribed_ids = self.context.get("subscribed_ids")
+        if subscribed_ids is not None:
+            return obj.id in subscribed_ids
         request = self.context.get("request")
         if request and hasattr(request, "user"):
             return UserFollow.objects.filter(
@@ -140,4 +149,6 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
         return False
 
     def get_recipes_count(self, obj):
+        if hasattr(obj, "recipes_count"):
+            return obj.recipes_count
         return obj.recipes.count()
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .auth_cache import invalidate_tokens
+from .jwt import revoke_user_tokens
+from .models import UserFollow
+from foodgram.versions import bump_version, user_version_name
+
+
+@receiver(post_delete, sender=Token)
+def reset_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reset_user_tokens(sender, instance, created, update_fields, **kwargs):
+    if created or (update_fields and set(update_fields) == {"last_login"}):
+        return
+    invalidate_tokens(
+        Token.objects.filter(user=instance).values_list("key", flat=True))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def revoke_user_jwts(sender, instance, created, **kwargs):
+    if not settings.JWT_AUTH_ENABLED or created:
+        return
+    if not instance.is_active or instance._password is not None:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def revoke_deleted_user_jwts(sender, instance, **kwargs):
+    if settings.JWT_AUTH_ENABLED:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=UserFollow)
+@receiver(post_delete, sender=UserFollow)
+def bump_follower_version(sender, instance, **kwargs):
+    bump_version(user_version_name(instance.user_from_id))
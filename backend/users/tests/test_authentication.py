@@ -0,0 +1,63 @@
+import json
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.auth_cache import get_cached_credentials, token_cache
+from users.models import CustomUser
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class CachedTokenAuthenticationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="user@example.com", username="user",
+            first_name="first", last_name="last", password="old-Pass-123",
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_snapshot_does_not_hold_password(self):
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 200)
+        user, token = get_cached_credentials(self.token.key)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIn("password", user.get_deferred_fields())
+
+    def test_unsafe_request_uses_fresh_user(self):
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 200)
+        CustomUser.objects.filter(pk=self.user.pk).update(last_name="new")
+        response = self.client.post(
+            "/api/users/set_password/",
+            json.dumps({
+                "current_password": "old-Pass-123",
+                "new_password": "new-Pass-456",
+            }),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 204)
+        user = CustomUser.objects.get(pk=self.user.pk)
+        self.assertEqual(user.last_name, "new")
+        self.assertTrue(user.check_password("new-Pass-456"))
+
+    def test_unsafe_request_rejects_deactivated_user(self):
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 200)
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(
+            "/api/users/set_password/",
+            json.dumps({
+                "current_password": "old-Pass-123",
+                "new_password": "new-Pass-456",
+            }),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.jwt import DenyList
+from users.models import RevokedToken
+
+
+class DenyListTest(TestCase):
+    def revoke(self, pk, jti):
+        RevokedToken.objects.create(
+            pk=pk, jti=jti, revoked_at=time.time(),
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+    def test_picks_up_rows_committed_out_of_id_order(self):
+        deny_list = DenyList()
+        self.revoke(10, "later-id")
+        deny_list.sync(force=True)
+        self.revoke(5, "earlier-id")
+        deny_list.sync(force=True)
+        self.assertTrue(deny_list.is_revoked({"jti": "later-id"}))
+        self.assertTrue(deny_list.is_revoked({"jti": "earlier-id"}))
+
+    def test_drops_expired_rows(self):
+        deny_list = DenyList()
+        self.revoke(1, "expiring")
+        deny_list.sync(force=True)
+        RevokedToken.objects.update(expires_at=timezone.now())
+        deny_list.sync(force=True)
+        self.assertFalse(deny_list.is_revoked({"jti": "expiring"}))
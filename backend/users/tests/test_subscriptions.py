@@ -0,0 +1,54 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import CustomUser, UserFollow
+
+LOCAL_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class SubscriptionBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author = (
+            CustomUser.objects.create_user(
+                email=f"{name}@example.com", username=name,
+                first_name=name, last_name=name, password="password",
+            )
+            for name in ("user", "author")
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_statuses(self, method, ids):
+        response = getattr(self.client, method)(
+            "/api/users/subscribe/", {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return {
+            result["id"]: result["status"]
+            for result in response.json()["results"]
+        }
+
+    def test_subscribe_reports_own_id_as_self(self):
+        missing = self.author.pk + 100
+        self.assertEqual(
+            self.get_statuses(
+                "post", [self.author.pk, self.user.pk, missing]),
+            {
+                self.author.pk: "subscribed",
+                self.user.pk: "self",
+                missing: "not_found",
+            },
+        )
+        self.assertFalse(
+            UserFollow.objects.filter(user_to=self.user).exists())
+
+    def test_unsubscribe_reports_own_id_as_self(self):
+        self.assertEqual(
+            self.get_statuses("delete", [self.author.pk, self.user.pk]),
+            {self.author.pk: "not_subscribed", self.user.pk: "self"},
+        )
@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from djoser.urls.authtoken import urlpatterns as auth_urlpatterns
 
-from .views import CustomUserViewSet
+from .views import (
+    CustomUserViewSet,
+    JWTLogoutView,
+    JWTObtainPairView,
+    JWTRefreshView,
+    JWTVerifyView,
+)
 
 
 router = DefaultRouter()
@@ -13,3 +20,13 @@ urlpatterns = [
     path("", include(router.urls)),
     path("auth/", include(auth_urlpatterns)),
 ]
+
+if settings.JWT_AUTH_ENABLED:
+    urlpatterns += [
+        path("auth/jwt/create/", JWTObtainPairView.as_view(),
+             name="jwt-create"),
+        path("auth/jwt/refresh/", JWTRefreshView.as_view(),
+             name="jwt-refresh"),
+        path("auth/jwt/verify/", JWTVerifyView.as_view(), name="jwt-verify"),
+        path("auth/jwt/logout/", JWTLogoutView.as_view(), name="jwt-logout"),
+    ]
@@ -1,21 +1,41 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import status, permissions
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+    TokenVerifyView,
+    TokenViewBase,
+)
 
+from .jwt import (
+    JWTLogoutSerializer,
+    JWTObtainPairSerializer,
+    JWTRefreshSerializer,
+    JWTVerifySerializer,
+)
 from .models import UserFollow
 from .permissions import IsAuthenticatedAndOwner
 from .serializers import CustomUserSerializer, UserSubscriptionSerializer
 from .pagination import LimitPageNumberPagination
+from recipes.models import Recipe
+from foodgram.db import link_rows, unlink_rows
+from foodgram.versions import bump_version, user_version_name
+from foodgram.pagination import KeysetPaginationMixin
+from foodgram.serializers import IdListSerializer, get_batch_results
 from foodgram.utils import validate_pk
 
 User = get_user_model()
 
 
-class CustomUserViewSet(DjoserUserViewSet):
+class CustomUserViewSet(KeysetPaginationMixin, DjoserUserViewSet):
     permission_classes = [permissions.AllowAny]
     serializer_class = CustomUserSerializer
     pagination_class = LimitPageNumberPagination
@@ -72,32 +92,54 @@ class CustomUserViewSet(DjoserUserViewSet):
         url_path="subscriptions",
     )
     def subscriptions(self, request):
-        user_ids = UserFollow.objects.filter(user_from=request.user
-                                             ).values_list(
-            "user_to", flat=True
+        recipes_limit = self.get_recipes_limit()
+        users = self.annotate_subscriptions(
+            User.objects.filter(
+                id__in=UserFollow.objects.filter(
+                    user_from=request.user).values("user_to")
+            ).order_by("id"),
+            recipes_limit,
         )
-        users = User.objects.filter(id__in=user_ids)
-        recipes_limit = request.query_params.get("recipes_limit")
-        try:
-            recipes_limit = int(
-                recipes_limit) if recipes_limit is not None else None
-        except ValueError:
-            recipes_limit = None
         page = self.paginate_queryset(users)
         if page is not None:
             serializer = UserSubscriptionSerializer(
                 page,
                 many=True,
-                context={"request": request, "recipes_limit": recipes_limit},
+                context={"request": request, "recipes_limit": recipes_limit,
+                         "subscribed_ids": {user.id for user in page}},
             )
             return self.get_paginated_response(serializer.data)
+        users = list(users)
         serializer = UserSubscriptionSerializer(
             users,
             many=True,
-            context={"request": request, "recipes_limit": recipes_limit},
+            context={"request": request, "recipes_limit": recipes_limit,
+                     "subscribed_ids": {user.id for user in users}},
         )
         return Response(serializer.data)
 
+    def get_recipes_limit(self):
+        recipes_limit = self.request.query_params.get("recipes_limit")
+        try:
+            return int(recipes_limit) if recipes_limit else None
+        except ValueError:
+            return None
+
+    def annotate_subscriptions(self, queryset, recipes_limit):
+        recipes = Recipe.objects.order_by("id")
+        if recipes_limit:
+            recipes = recipes.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F("author_id"),
+                    order_by=F("id").asc(),
+                )
+            ).filter(row_number__lte=recipes_limit)
+        return queryset.annotate(recipes_count=Count("recipes")
+                                 ).prefetch_related(
+            Prefetch("recipes", queryset=recipes, to_attr="preview_recipes")
+        )
+
     @action(
         detail=True,
         methods=["post", "delete"],
@@ -124,18 +166,46 @@ class CustomUserViewSet(DjoserUserViewSet):
             return self.handle_create_subscription(request, user_to)
         return self.handle_delete_subscription(request, user_to)
 
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        permission_classes=[IsAuthenticated],
+        url_path="subscribe",
+        url_name="subscribe-batch",
+    )
+    @transaction.atomic
+    def manage_subscriptions(self, request):
+        serializer = IdListSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_ids = serializer.validated_data["ids"]
+        if request.method == "POST":
+            changed = link_rows(UserFollow, "user_from", request.user.pk,
+                                "user_to", user_ids, exclude_owner=True)
+            statuses = ("subscribed", "already_subscribed")
+        else:
+            changed = unlink_rows(UserFollow, "user_from", request.user.pk,
+                                  "user_to", user_ids)
+            statuses = ("unsubscribed", "not_subscribed")
+        if changed:
+            bump_version(user_version_name(request.user.pk))
+        unchanged = [pk for pk in user_ids if pk not in changed]
+        existing = set(
+            User.objects.filter(pk__in=unchanged).values_list("id", flat=True)
+        ) if unchanged else set()
+        return Response(get_batch_results(
+            user_ids, changed, existing, *statuses,
+            rejected={request.user.pk: "self"}))
+
     def handle_create_subscription(self, request, user_to):
         _, created = UserFollow.objects.get_or_create(
             user_from=request.user, user_to=user_to
         )
         if created:
-            recipes_limit = request.query_params.get("recipes_limit")
-            context = {"request": request}
-            if recipes_limit:
-                try:
-                    context["recipes_limit"] = int(recipes_limit)
-                except ValueError:
-                    pass
+            recipes_limit = self.get_recipes_limit()
+            user_to = self.annotate_subscriptions(
+                User.objects.filter(pk=user_to.pk), recipes_limit).get()
+            context = {"request": request, "recipes_limit": recipes_limit,
+                       "subscribed_ids": {user_to.id}}
             return Response(
                 UserSubscriptionSerializer(user_to, context=context).data,
                 status=status.HTTP_201_CREATED,
@@ -156,3 +226,23 @@ class CustomUserViewSet(DjoserUserViewSet):
             {"detail": "Subscription not found."},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class JWTObtainPairView(TokenObtainPairView):
+    serializer_class = JWTObtainPairSerializer
+
+
+class JWTRefreshView(TokenRefreshView):
+    serializer_class = JWTRefreshSerializer
+
+
+class JWTVerifyView(TokenVerifyView):
+    serializer_class = JWTVerifySerializer
+
+
+class JWTLogoutView(TokenViewBase):
+    serializer_class = JWTLogoutSerializer
+
+    def post(self, request, *args, **kwargs):
+        super().post(request, *args, **kwargs)
+        return Response(status=status.HTTP_204_NO_CONTENT)